@@ -0,0 +1,102 @@
+import numpy as np
+
+
+def liability_arrays(liabilities):
+    """Turns the 'liabilites.json' dict into (names, balances, annual rates, monthly payments)."""
+    names = list(liabilities)
+    balances = np.array([liabilities[n].get('outstanding_balance', 0) for n in names], dtype=np.float64)
+    rates = np.array([liabilities[n].get('interest_rate', 0) for n in names], dtype=np.float64)
+    # Credit cards only list a minimum payment; that's what gets paid unless a scenario adds more.
+    payments = np.array([liabilities[n].get('monthly_payment', liabilities[n].get('minimum_payment', 0))
+                         for n in names], dtype=np.float64)
+    return names, balances, rates, payments
+
+
+def amortize(balances, annual_rates, payments, months, extra_payments=None, lump_sums=None):
+    """Projects every loan under every scenario, month by month, in one set of array operations.
+
+    balances, annual_rates and payments have one entry per loan; extra_payments
+    and lump_sums are (scenarios, loans) arrays of what each scenario pays on
+    top of the regular payment each month, and up front. Uses the closed-form
+    balance B_k = B_0 (1 + r)^k - P ((1 + r)^k - 1) / r, clipped at zero once
+    a loan is paid off. Returns a dict of:
+        balances (scenarios, loans, months + 1), interest and principal
+        (scenarios, loans, months), and payoff_month (scenarios, loans;
+        -1 for loans still open at the end of the horizon).
+    """
+    if extra_payments is None:
+        extra_payments = np.zeros((1, len(balances)))
+    if lump_sums is None:
+        lump_sums = np.zeros_like(extra_payments)
+
+    lump_sums = np.minimum(lump_sums, balances)
+    start = (balances - lump_sums)[..., None]
+    payment = (payments + extra_payments)[..., None]
+    r = np.broadcast_to(annual_rates / 12, start.shape[:-1])[..., None]
+
+    k = np.arange(months + 1)
+    growth = (1 + r) ** k
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = np.where(r > 0, (growth - 1) / np.where(r > 0, r, 1), k)
+    projected = np.maximum(start * growth - payment * annuity, 0.0)
+
+    interest = projected[..., :-1] * r
+    paid = projected[..., :-1] + interest - projected[..., 1:]
+    principal = paid - interest
+
+    paid_off = projected <= 1e-9
+    payoff_month = np.where(paid_off.any(axis=-1), paid_off.argmax(axis=-1), -1)
+    return {
+        "balances": projected,
+        "interest": interest,
+        "principal": principal,
+        "payoff_month": payoff_month,
+        "lump_sums": lump_sums,
+    }
+
+
+def scenario_arrays(names, scenarios):
+    """Builds (extra_payments, lump_sums) arrays from scenario dicts.
+
+    Each scenario may give 'extra_payment' and 'lump_sum' either as one number
+    applied to every loan or as a {loan name: amount} dict. Raises ValueError
+    for amounts that aren't finite.
+    """
+    def row(value):
+        if isinstance(value, dict):
+            return [float(value.get(n, 0)) for n in names]
+        return [float(value or 0)] * len(names)
+
+    extra = np.array([row(s.get('extra_payment')) for s in scenarios], dtype=np.float64).reshape(len(scenarios), len(names))
+    lump = np.array([row(s.get('lump_sum')) for s in scenarios], dtype=np.float64).reshape(len(scenarios), len(names))
+    if not (np.isfinite(extra).all() and np.isfinite(lump).all()):
+        raise ValueError("scenario amounts must be finite")
+    return np.maximum(extra, 0), np.maximum(lump, 0)
+
+
+def project_net_worth(total_assets, liabilities, months, scenarios):
+    """Net-worth time series for each what-if scenario.
+
+    Assets (bank, cash, investments, EPF) are held at today's value. Loan
+    payments (and lump sums) come out of them, so net worth only changes by
+    the interest paid: net_worth_k = assets - payments so far - balances_k.
+    """
+    names, balances, rates, payments = liability_arrays(liabilities)
+    extra, lump = scenario_arrays(names, scenarios)
+    result = amortize(balances, rates, payments, months, extra, lump)
+
+    cumulative_interest = np.concatenate(
+        [np.zeros((len(scenarios), 1)), np.cumsum(result['interest'].sum(axis=1), axis=1)], axis=1)
+    debt = result['balances'].sum(axis=1)
+    net_worth = total_assets - balances.sum() - cumulative_interest
+
+    projections = []
+    for i, scenario in enumerate(scenarios):
+        projections.append({
+            "name": scenario.get('name', f"Scenario {i + 1}"),
+            "net_worth": np.round(net_worth[i], 2).tolist(),
+            "liabilities": np.round(debt[i], 2).tolist(),
+            "total_interest": round(float(result['interest'][i].sum()), 2),
+            "payoff_month": {n: (int(m) if m >= 0 else None) for n, m in zip(names, result['payoff_month'][i])},
+        })
+    return projections
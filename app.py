@@ -1,194 +1,789 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import json
-import re
-from datetime import datetime, timedelta
-import random
-from waitress import serve
-from fuzzywuzzy import fuzz # A great library for fuzzy string matching
-
-# Load mock data (your existing function, no change needed here)
-def load_data():
-    data = {}
-    try:
-        with open('Transactions Data.json', 'r', encoding='utf-8') as f:
-            data['transactions'] = json.load(f)
-        with open('Credit Data.json', 'r', encoding='utf-8') as f:
-            data['credit'] = json.load(f)
-        with open('Assets Data.json', 'r', encoding='utf-8') as f:
-            data['assets'] = json.load(f)
-        with open('EPF DATA.json', 'r', encoding='utf-8') as f:
-            data['epf'] = json.load(f)
-        with open('Investments data.json', 'r', encoding='utf-8') as f:
-            data['investments'] = json.load(f)
-        with open('liabilites.json', 'r', encoding='utf-8') as f:
-            data['liabilities'] = json.load(f)
-    except FileNotFoundError as e:
-        print(f"Error: {e}. Please ensure all JSON files are in the same directory.")
-        return None
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON format in file: {e}")
-        return None
-    except Exception as e:
-        print(f"Unexpected error while loading data: {e}")
-        return None
-    return data
-
-DATA = load_data()
-app = Flask(__name__)
-CORS(app)
-
-# ----------------------------------------------------
-# 🌟 Step 1: Define Your Financial "Tools" or Functions 🌟
-# ----------------------------------------------------
-# These functions will contain the core business logic.
-# The AI's job is to figure out which one to call.
-
-def get_total_spending(permissions):
-    """Calculates total debit transactions from the last month."""
-    if not permissions.get('transactions'):
-        return "You have revoked access to Transactions data. Please enable permissions to proceed."
-
-    # This is a good place to make the logic more robust.
-    # The provided data is for specific months, so let's check for 'august'
-    # as a stand-in for "last month" since it's the last month available.
-    if 'august' not in DATA.get('transactions', {}):
-        return "I'm sorry, I don't have transaction data for the last month."
-    
-    total_spent = sum(t['amount'] for t in DATA['transactions']['august'] if t['type'] == 'debit')
-    return f"You spent a total of ${total_spent:.2f} in August."
-
-def forecast_savings(permissions):
-    """Forecasts savings based on average income and expenses."""
-    if not permissions.get('transactions') or not permissions.get('assets'):
-        return "To forecast savings, I need access to both your Assets and Transactions data. Please enable permissions to proceed."
-
-    # Calculate average monthly savings from available data
-    total_income = sum(t['amount'] for t in DATA['transactions']['january'] if t['type'] == 'credit')
-    total_expense = sum(t['amount'] for t in DATA['transactions']['january'] if t['type'] == 'debit')
-    avg_monthly_savings = total_income - total_expense
-    
-    current_savings = DATA.get('assets', {}).get('bank_balance', 0) + DATA.get('assets', {}).get('cash', 0)
-    forecasted_savings = []
-    for i in range(1, 7):
-        current_savings += avg_monthly_savings
-        forecasted_savings.append({"month": f"Month {i}", "savings": round(current_savings, 2)})
-        
-    return "Based on your current trends, here is a forecast of your savings for the next 6 months...\n" + json.dumps(forecasted_savings)
-
-def calculate_net_worth(permissions):
-    """Calculates net worth by summing assets and subtracting liabilities."""
-    if not permissions.get('assets') or not permissions.get('liabilities') or not permissions.get('investments'):
-        return "To calculate your net worth, I need access to your Assets, Investments, and Liabilities data."
-
-    # Sum all assets
-    total_assets = DATA['assets'].get('bank_balance', 0) + DATA['assets'].get('cash', 0)
-    total_assets += sum(inv['total_value'] for inv in DATA['investments'].values())
-    total_assets += DATA['epf'].get('balance', 0) # Include EPF balance in assets
-
-    # Sum all liabilities
-    total_liabilities = sum(loan['outstanding_balance'] for loan in DATA['liabilities'].values())
-
-    net_worth = total_assets - total_liabilities
-    return f"Your estimated net worth is ${net_worth:.2f}."
-
-def get_credit_score(permissions):
-    """Retrieves credit score and rating."""
-    if not permissions.get('credit'):
-        return "You have revoked access to Credit data. Please enable permissions to proceed."
-
-    score = DATA['credit']['score']
-    rating = DATA['credit']['rating']
-    return f"Your current credit score is {score}, which is an {rating} rating."
-
-# ----------------------------------------------------
-# 🧠 Step 2: Create a Smarter Intent Recognition System 🧠
-# ----------------------------------------------------
-# This system maps user queries to the right function.
-# You can use simple keywords and fuzzy matching for a start.
-
-INTENT_MAP = {
-    'get_total_spending': ['spending', 'spent', 'debits', 'money out'],
-    'forecast_savings': ['savings forecast', 'future savings', 'how much can i save'],
-    'calculate_net_worth': ['net worth', 'how much i am worth', 'total assets and liabilities', 'financial position'],
-    'get_credit_score': ['credit score', 'credit rating', 'check my credit']
-}
-
-def get_intent(query):
-    query_lower = query.lower()
-    
-    # Check for exact matches first
-    greeting_keywords = ['hello', 'hi', 'hey', 'greetings']
-    if any(word in query_lower.split() for word in greeting_keywords):
-        return 'greeting'
-    
-    thanks_keywords = ['thanks', 'thank you', 'appreciate it']
-    if any(word in query_lower.split() for word in thanks_keywords):
-        return 'thanks'
-
-    # Use fuzzy matching to find the best intent match
-    best_match_score = 0
-    best_match_intent = 'unknown'
-
-    for intent, keywords in INTENT_MAP.items():
-        for keyword in keywords:
-            # Use a threshold to avoid false positives
-            match_score = fuzz.token_sort_ratio(query_lower, keyword)
-            if match_score > best_match_score and match_score > 60: # Threshold of 60
-                best_match_score = match_score
-                best_match_intent = intent
-    
-    return best_match_intent
-
-# ----------------------------------------------------
-# 🚀 Step 3: Revise the Main Insight Logic 🚀
-# ----------------------------------------------------
-# The main function now calls the correct "tool" based on the detected intent.
-def get_insights(query, permissions):
-    if DATA is None:
-        return "There was a problem loading the financial data files. Please check the server logs."
-
-    intent = get_intent(query)
-    
-    if intent == 'greeting':
-        return random.choice([
-            "Hello! How can I help with your finances today?", 
-            "Hi there! What financial questions do you have?", 
-            "Hey! Ready to look at your finances?"
-        ])
-    
-    if intent == 'thanks':
-        return random.choice(["You're welcome!", "No problem!", "Happy to help!"])
-    
-    if intent == 'get_total_spending':
-        return get_total_spending(permissions)
-
-    if intent == 'forecast_savings':
-        return forecast_savings(permissions)
-        
-    if intent == 'calculate_net_worth':
-        return calculate_net_worth(permissions)
-
-    if intent == 'get_credit_score':
-        return get_credit_score(permissions)
-
-    return "I'm sorry, I couldn't understand that query. Please try asking a different question."
-
-@app.route('/query', methods=['POST'])
-def process_user_query():
-    try:
-        data = request.json
-        query = data.get('query', '')
-        permissions = data.get('permissions', {})
-        response = get_insights(query, permissions)
-        return jsonify({"response": response})
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return jsonify({"response": "Sorry, something went wrong on our end. Please try again."}), 500
-
-if __name__ == '__main__':
-    if DATA is not None:
-        print("Starting production server with Waitress...")
-        serve(app, host='0.0.0.0', port=5000)
-    else:
+from flask import Flask, Response, g, request, jsonify
+from flask_cors import CORS
+import argparse
+import json
+import math
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+import random
+import threading
+import time
+from itertools import count
+from waitress import serve
+from amortization import project_net_worth
+from answer_cache import AnswerCache
+from data_files import DATA_FILES
+from data_reloader import DataReloader, file_signature
+from forecast_engine import monthly_flows, simulate_savings
+from intent_index import IntentIndex
+from metrics import MultiprocessMetrics, ProfileSampler, Registry
+from snapshot import read_snapshot, write_snapshot
+from stream_loader import load_transactions
+from transaction_store import TYPE_CODES, month_name, to_day
+from user_store import UserDataStore, is_valid_user_id
+
+# Request, stage and data-load instrumentation, served as text on /metrics
+METRICS = Registry()
+REQUESTS_TOTAL = METRICS.counter('finance_requests_total', "HTTP requests by endpoint and status.", ('endpoint', 'status'))
+REQUEST_SECONDS = METRICS.histogram('finance_request_seconds', "HTTP request latency by endpoint.", ('endpoint',))
+STAGE_SECONDS = METRICS.histogram('finance_stage_seconds', "Time spent classifying queries ('intent') and answering them ('tool').", ('stage',))
+INTENT_SECONDS = METRICS.histogram('finance_intent_seconds', "Time spent answering each intent.", ('intent',))
+INTENTS_TOTAL = METRICS.counter('finance_intents_total', "Queries answered by intent.", ('intent',))
+UNKNOWN_INTENTS = METRICS.counter('finance_unknown_intents_total', "Queries no intent matched.")
+PERMISSION_DENIALS = METRICS.counter('finance_permission_denials_total', "Answers refused for missing permissions.", ('intent',))
+DATA_LOAD_SECONDS = METRICS.histogram('finance_data_load_seconds', "Time to load a full dataset.")
+DATA_PARSE_SECONDS = METRICS.histogram('finance_data_parse_seconds', "Time to parse one data file.", ('dataset',))
+
+# Sampled per-request cProfile dumps; off unless --profile-rate is set
+PROFILER = ProfileSampler(rate=0.0, directory='profiles')
+
+# Every successful load gets a new version number so cached answers can't outlive it
+_DATA_VERSIONS = count(1)
+
+def parse_data_file(key, path):
+    """Parses one data file into the form the tools read."""
+    with DATA_PARSE_SECONDS.time(key):
+        if key == 'transactions':
+            # Transactions are streamed row by row into a columnar store so tools can use vectorized sums
+            return load_transactions(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+# Binary copy of the parsed data written next to the JSON files; see snapshot.py
+SNAPSHOT_FILE = 'data.snapshot'
+USE_SNAPSHOT = True
+
+def save_snapshot(path, data, sources):
+    """Writes a snapshot; returns False when the directory can't take one."""
+    try:
+        write_snapshot(path, data, sources)
+    except OSError as e:
+        # A read-only data directory just means every start parses the JSON
+        print(f"Warning: could not write snapshot '{path}': {e}")
+        return False
+    return True
+
+# Load mock data (your existing function, no change needed here)
+def load_data(base_dir='.', files=DATA_FILES):
+    started = time.perf_counter()
+    paths = {key: os.path.join(base_dir, path) for key, path in files.items()}
+    snapshot_path = os.path.join(base_dir, SNAPSHOT_FILE)
+    data = read_snapshot(snapshot_path, paths) if USE_SNAPSHOT else None
+    if data is not None:
+        data['version'] = next(_DATA_VERSIONS)
+        data['derived'] = {}
+        DATA_LOAD_SECONDS.observe(time.perf_counter() - started)
+        return data
+
+    data = {}
+    # Signatures are taken before parsing so a file edited mid-load leaves the snapshot stale
+    sources = {key: (path, file_signature(path)) for key, path in paths.items()}
+    try:
+        for key, path in paths.items():
+            data[key] = parse_data_file(key, path)
+    except FileNotFoundError as e:
+        print(f"Error: {e}. Please ensure all JSON files are in the same directory.")
+        return None
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON format in file: {e}")
+        return None
+    except Exception as e:
+        print(f"Unexpected error while loading data: {e}")
+        return None
+    if USE_SNAPSHOT and all(signature is not None for _, signature in sources.values()):
+        if save_snapshot(snapshot_path, data, sources):
+            # Serve from the file just written rather than the parsed copy, so every worker
+            # process that loads these files shares the mapped pages instead of holding its own
+            data = read_snapshot(snapshot_path, paths) or data
+    data['version'] = next(_DATA_VERSIONS)
+    data['derived'] = {}
+    DATA_LOAD_SECONDS.observe(time.perf_counter() - started)
+    return data
+
+# The shared dataset's files; --transactions-file only ever changes this copy, so per-user
+# directories always read their own files (an absolute path would otherwise escape base_dir)
+SHARED_DATA_FILES = dict(DATA_FILES)
+
+# The shared dataset, loaded once the command-line flags are applied (see __main__);
+# code that imports app calls reload_data() itself
+DATA = None
+
+# Answers for the same intent, permissions and data version are reused until they expire
+ANSWER_CACHE = AnswerCache(maxsize=1024, ttl=300)
+
+# Serializes writers; readers never take it
+_SWAP_LOCK = threading.Lock()
+
+def swap_data(data):
+    """Publishes a new snapshot and drops every answer computed from the old one.
+
+    Reloads never modify a published snapshot: requests grab DATA once and
+    keep using that dict, so a reload can't hand them a half-loaded one.
+    """
+    global DATA
+    DATA = data
+    ANSWER_CACHE.clear()
+
+def reload_data():
+    """Re-reads all the JSON files."""
+    data = load_data(files=SHARED_DATA_FILES)
+    if data is not None:
+        with _SWAP_LOCK:
+            swap_data(data)
+    return data
+
+def apply_data_updates(updates):
+    """Builds a new snapshot from the current one with only the re-parsed datasets replaced."""
+    if DATA is None:
+        return reload_data()
+    with _SWAP_LOCK:
+        data = dict(DATA, **updates)
+        data['version'] = next(_DATA_VERSIONS)
+        data['derived'] = {}
+        swap_data(data)
+    return data
+
+def snapshot_size(data):
+    """Rough in-memory size of a snapshot, used to keep per-user data within budget."""
+    size = 0
+    for key, value in data.items():
+        if key == 'transactions':
+            size += value.nbytes
+        elif key not in ('version', 'derived'):
+            size += len(json.dumps(value))
+    return size
+
+# Set when several worker processes share DATA copy-on-write; an append would only reach one of them
+READ_ONLY_DATA = False
+
+# Per-user datasets live in USERS_DIR/<user_id>/ and are loaded on first access
+USERS_DIR = 'users'
+USER_STORE = UserDataStore(USERS_DIR, load_data, snapshot_size, memory_budget=512 * 1024 * 1024)
+
+app = Flask(__name__)
+CORS(app)
+
+# ----------------------------------------------------
+# 🌟 Step 1: Define Your Financial "Tools" or Functions 🌟
+# ----------------------------------------------------
+# These functions will contain the core business logic.
+# The AI's job is to figure out which one to call.
+
+def derived(data, name, compute):
+    """Computes a value from a snapshot once; every later request and batch item reuses it."""
+    values = data['derived']
+    if name not in values:
+        values[name] = compute()
+    return values[name]
+
+def liquid_savings(data):
+    """Bank balance plus cash."""
+    return derived(data, 'liquid_savings',
+                   lambda: data['assets'].get('bank_balance', 0) + data['assets'].get('cash', 0))
+
+def total_assets(data):
+    """Liquid savings plus investments and the EPF balance."""
+    return derived(data, 'total_assets', lambda: (
+        liquid_savings(data)
+        + sum(inv['total_value'] for inv in data['investments'].values())
+        + data['epf'].get('balance', 0)  # Include EPF balance in assets
+    ))
+
+def total_liabilities(data):
+    """Outstanding balance of every loan."""
+    return derived(data, 'total_liabilities',
+                   lambda: sum(loan['outstanding_balance'] for loan in data['liabilities'].values()))
+
+def get_total_spending(permissions, data):
+    """Calculates total debit transactions from the last month."""
+    if not permissions.get('transactions'):
+        return "You have revoked access to Transactions data. Please enable permissions to proceed."
+
+    # The latest month that has any transactions stands in for "last month".
+    rollups = data['transactions'].rollups
+    if not rollups.months():
+        return "I'm sorry, I don't have transaction data for the last month."
+
+    last_month = rollups.months()[-1]
+    total_spent = rollups.month_total(last_month, 'debit')
+    return f"You spent a total of ${total_spent:.2f} in {month_name(last_month)}."
+
+FORECAST_MONTHS = 6
+FORECAST_PATHS = 10000
+
+def savings_forecast(data, horizon, paths=FORECAST_PATHS):
+    """Monte Carlo savings bands for each future month, computed once per data version.
+
+    "savings" is the median path; "p10"/"p90" bound the likely range.
+    """
+    def compute():
+        income, expenses = monthly_flows(data['transactions'].rollups)
+        bands = simulate_savings(liquid_savings(data), income, expenses, horizon=horizon, paths=paths)
+        return [
+            {"month": f"Month {i + 1}", "savings": round(float(bands['p50'][i]), 2),
+             "p10": round(float(bands['p10'][i]), 2), "p90": round(float(bands['p90'][i]), 2)}
+            for i in range(horizon)
+        ]
+    return derived(data, ('savings_forecast', horizon, paths), compute)
+
+def forecast_savings(permissions, data):
+    """Forecasts savings from the income and expenses of every month on record."""
+    if not permissions.get('transactions') or not permissions.get('assets'):
+        return "To forecast savings, I need access to both your Assets and Transactions data. Please enable permissions to proceed."
+
+    if not data['transactions'].rollups.months():
+        return "I'm sorry, I don't have enough transaction data to forecast your savings."
+
+    forecasted_savings = savings_forecast(data, FORECAST_MONTHS)
+    return f"Based on your current trends, here is a forecast of your savings for the next {FORECAST_MONTHS} months...\n" + json.dumps(forecasted_savings)
+
+def calculate_net_worth(permissions, data):
+    """Calculates net worth by summing assets and subtracting liabilities."""
+    if not permissions.get('assets') or not permissions.get('liabilities') or not permissions.get('investments'):
+        return "To calculate your net worth, I need access to your Assets, Investments, and Liabilities data."
+
+    net_worth = total_assets(data) - total_liabilities(data)
+    return f"Your estimated net worth is ${net_worth:.2f}."
+
+PROJECTION_MONTHS = 12
+
+def net_worth_projection(data, months, scenarios):
+    """Projects net worth and loan balances month by month for each what-if scenario."""
+    return project_net_worth(total_assets(data), data['liabilities'], months, scenarios)
+
+def project_net_worth_over_time(permissions, data):
+    """Summarizes when each loan is paid off and where net worth will be in a year."""
+    if not permissions.get('assets') or not permissions.get('liabilities') or not permissions.get('investments'):
+        return "To project your net worth, I need access to your Assets, Investments, and Liabilities data."
+
+    baseline = derived(data, 'net_worth_projection',
+                       lambda: net_worth_projection(data, PROJECTION_MONTHS, [{"name": "Current payments"}])[0])
+    payoffs = [f"{name.replace('_', ' ')} in {month} months" if month is not None
+               else f"{name.replace('_', ' ')} not within {PROJECTION_MONTHS} months"
+               for name, month in baseline['payoff_month'].items()]
+    return (f"At your current payments, your net worth will be ${baseline['net_worth'][-1]:.2f} in {PROJECTION_MONTHS} months, "
+            f"after ${baseline['total_interest']:.2f} of interest. Loans paid off: {', '.join(payoffs)}.")
+
+def get_credit_score(permissions, data):
+    """Retrieves credit score and rating."""
+    if not permissions.get('credit'):
+        return "You have revoked access to Credit data. Please enable permissions to proceed."
+
+    score = data['credit']['score']
+    rating = data['credit']['rating']
+    return f"Your current credit score is {score}, which is an {rating} rating."
+
+# ----------------------------------------------------
+# 🧠 Step 2: Create a Smarter Intent Recognition System 🧠
+# ----------------------------------------------------
+# This system maps user queries to the right function.
+# You can use simple keywords and fuzzy matching for a start.
+
+INTENT_MAP = {
+    'get_total_spending': ['spending', 'spent', 'debits', 'money out'],
+    'forecast_savings': ['savings forecast', 'future savings', 'how much can i save'],
+    'calculate_net_worth': ['net worth', 'how much i am worth', 'total assets and liabilities', 'financial position'],
+    'get_credit_score': ['credit score', 'credit rating', 'check my credit'],
+    'project_net_worth_over_time': ['net worth projection', 'loan payoff', 'debt payoff', 'when will my loans be paid off']
+}
+
+# Exact matches are checked before any fuzzy matching
+GREETING_KEYWORDS = ['hello', 'hi', 'hey', 'greetings']
+THANKS_KEYWORDS = ['thanks', 'thank you', 'appreciate it']
+
+# Compiled once at startup so each query only fuzzy-scores a shortlist of keywords
+INTENT_INDEX = IntentIndex(INTENT_MAP, threshold=60, exact_intents={
+    'greeting': GREETING_KEYWORDS,
+    'thanks': THANKS_KEYWORDS,
+})
+
+def get_intent(query):
+    with STAGE_SECONDS.time('intent'):
+        return INTENT_INDEX.classify(query)
+
+# Each intent's tool and the permissions it checks
+TOOLS = {
+    'get_total_spending': (get_total_spending, ('transactions',)),
+    'forecast_savings': (forecast_savings, ('transactions', 'assets')),
+    'calculate_net_worth': (calculate_net_worth, ('assets', 'liabilities', 'investments')),
+    'get_credit_score': (get_credit_score, ('credit',)),
+    'project_net_worth_over_time': (project_net_worth_over_time, ('assets', 'liabilities', 'investments')),
+}
+
+# ----------------------------------------------------
+# 🚀 Step 3: Revise the Main Insight Logic 🚀
+# ----------------------------------------------------
+# The main function now calls the correct "tool" based on the detected intent.
+def get_insights(query, permissions, data=None):
+    if data is None:
+        data = DATA  # One snapshot for the whole request, even if a reload swaps DATA meanwhile
+    if data is None:
+        return "There was a problem loading the financial data files. Please check the server logs."
+
+    return answer_intent(get_intent(query), permissions, data)
+
+def answer_intent(intent, permissions, data):
+    """Runs the tool for an already classified intent."""
+    INTENTS_TOTAL.inc(intent)
+    started = time.perf_counter()
+    try:
+        return run_tool(intent, permissions, data)
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, 'tool')
+        INTENT_SECONDS.observe(elapsed, intent)
+
+def run_tool(intent, permissions, data):
+    if intent == 'greeting':
+        return random.choice([
+            "Hello! How can I help with your finances today?", 
+            "Hi there! What financial questions do you have?", 
+            "Hey! Ready to look at your finances?"
+        ])
+    
+    if intent == 'thanks':
+        return random.choice(["You're welcome!", "No problem!", "Happy to help!"])
+    
+    tool = TOOLS.get(intent)
+    if tool is None:
+        UNKNOWN_INTENTS.inc()
+        return "I'm sorry, I couldn't understand that query. Please try asking a different question."
+
+    func, reads = tool
+    if not all(permissions.get(name) for name in reads):
+        PERMISSION_DENIALS.inc(intent)
+    # Only the permissions a tool actually reads are part of its cache key
+    key = (intent, tuple(bool(permissions.get(name)) for name in reads), data['version'])
+    return ANSWER_CACHE.get_or_compute(key, lambda: func(permissions, data))
+
+@app.before_request
+def start_request_metrics():
+    g.started = time.perf_counter()
+    g.profiler = PROFILER.start()
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    REQUESTS_TOTAL.inc(endpoint, response.status_code)
+    REQUEST_SECONDS.observe(time.perf_counter() - g.get('started', time.perf_counter()), endpoint)
+    return response
+
+@app.teardown_request
+def stop_request_profiler(exc):
+    PROFILER.stop(g.pop('profiler', None), request.path)
+
+METRICS.counter_callback('finance_answer_cache_hits_total', "Answer cache hits since start.", lambda: ANSWER_CACHE.stats()['hits'])
+METRICS.counter_callback('finance_answer_cache_misses_total', "Answer cache misses since start.", lambda: ANSWER_CACHE.stats()['misses'])
+METRICS.gauge('finance_answer_cache_size', "Answers currently cached.", lambda: ANSWER_CACHE.stats()['size'])
+METRICS.gauge('finance_users_loaded', "Per-user datasets currently in memory.", lambda: USER_STORE.stats()['users_loaded'])
+METRICS.gauge('finance_user_memory_bytes', "Estimated memory held by per-user datasets.", lambda: USER_STORE.stats()['memory_bytes'])
+
+# Set in each worker when serving with --workers > 1, so every endpoint below reports all of them
+SHARED_METRICS = None
+STATS_SOURCES = {'cache': ANSWER_CACHE.stats, 'users': USER_STORE.stats}
+PER_WORKER_SETTINGS = ('ttl_seconds', 'maxsize', 'memory_budget_bytes')
+
+def render_metrics():
+    return METRICS.render() if SHARED_METRICS is None else SHARED_METRICS.render()
+
+def combined_stats(name):
+    """One stats dict for this process, or summed over the running workers.
+
+    Per-worker settings are reported as set. Estimated user memory counts
+    each worker's mapping of a shared snapshot, so it overstates real use.
+    """
+    if SHARED_METRICS is None:
+        return STATS_SOURCES[name]()
+    per_worker = SHARED_METRICS.collect(name)
+    combined = {}
+    for stats in per_worker:
+        for key, value in stats.items():
+            combined[key] = combined.get(key, 0) + value
+    # Settings apply to each worker on its own, so they aren't summed
+    for key in PER_WORKER_SETTINGS:
+        if key in combined:
+            combined[key] = per_worker[0][key]
+    if 'hit_rate' in combined:
+        lookups = combined['hits'] + combined['misses']
+        combined['hit_rate'] = round(combined['hits'] / lookups, 4) if lookups else 0.0
+    combined['workers'] = len(per_worker)
+    return combined
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(combined_stats('cache'))
+
+@app.route('/users/stats', methods=['GET'])
+def user_stats():
+    return jsonify(combined_stats('users'))
+
+def get_batch_insights(items, data=None):
+    """Answers a list of {query, permissions} items against one snapshot, in order.
+
+    Queries are classified up front and items that resolve to the same
+    intent and permissions are only computed once.
+    """
+    if data is None:
+        data = DATA
+    if data is None:
+        return ["There was a problem loading the financial data files. Please check the server logs."] * len(items)
+
+    classified = [(get_intent(item.get('query', '')), item.get('permissions', {})) for item in items]
+    answers = {}
+    responses = []
+    for intent, permissions in classified:
+        tool = TOOLS.get(intent)
+        if tool is None:
+            responses.append(answer_intent(intent, permissions, data))
+            continue
+        key = (intent, tuple(bool(permissions.get(name)) for name in tool[1]))
+        if key not in answers:
+            answers[key] = answer_intent(intent, permissions, data)
+        responses.append(answers[key])
+    return responses
+
+def resolve_user_data(user_id):
+    """Returns (snapshot, None) for a request's user, or (None, (error body, status))."""
+    # Without a user id the shared single-user dataset is used
+    if user_id is None:
+        return None, None
+    if not is_valid_user_id(user_id):
+        return None, ({"response": "Invalid user id."}, 400)
+    user_data = USER_STORE.get(user_id)
+    if user_data is None:
+        return None, ({"response": "I couldn't find any financial data for this user."}, 404)
+    return user_data, None
+
+# The request handlers return (body, status) so both the Flask and the ASGI front ends can serve them
+SERVER_ERROR = {"response": "Sorry, something went wrong on our end. Please try again."}
+
+def handle_query(payload):
+    query = payload.get('query', '')
+    permissions = payload.get('permissions', {})
+    user_data, error = resolve_user_data(payload.get('user_id'))
+    if error:
+        return error
+
+    response = get_insights(query, permissions, user_data)
+    return {"response": response}, 200
+
+MAX_BATCH_SIZE = 100
+
+def handle_batch_query(payload):
+    items = payload.get('items')
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return {"response": "Expected 'items' to be a list of {query, permissions} objects."}, 400
+    if len(items) > MAX_BATCH_SIZE:
+        return {"response": f"A batch can hold at most {MAX_BATCH_SIZE} queries."}, 400
+    user_data, error = resolve_user_data(payload.get('user_id'))
+    if error:
+        return error
+
+    return {"responses": get_batch_insights(items, user_data)}, 200
+
+def append_transaction(data, transaction):
+    """Returns a new snapshot with one more transaction; the published one is left untouched.
+
+    Appended transactions live in memory only; the next reload of the
+    transactions export (or eviction of a user) replaces them.
+    """
+    updated = dict(data, transactions=data['transactions'].appended(transaction))
+    updated['version'] = next(_DATA_VERSIONS)
+    updated['derived'] = {}
+    return updated
+
+def parse_transaction(raw):
+    """Validates a transaction from a request; returns (transaction, None) or (None, error message)."""
+    if not isinstance(raw, dict):
+        return None, "Expected 'transaction' to be an object."
+    try:
+        date = datetime.strptime(str(raw.get('date')), '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        return None, "Transaction 'date' must look like YYYY-MM-DD."
+    amount = raw.get('amount')
+    try:
+        # Flask's JSON parser accepts NaN and Infinity, which would poison every rollup
+        valid = not isinstance(amount, bool) and isinstance(amount, (int, float)) and math.isfinite(amount) and amount > 0
+    except OverflowError:
+        valid = False
+    if not valid:
+        return None, "Transaction 'amount' must be a positive number."
+    if raw.get('type') not in TYPE_CODES:
+        return None, "Transaction 'type' must be 'debit' or 'credit'."
+    category = raw.get('category', 'Other')
+    if not isinstance(category, str) or not category.strip():
+        return None, "Transaction 'category' must be a non-empty string."
+    return {"date": date, "amount": float(amount), "type": raw['type'], "category": category.strip(),
+            "description": str(raw.get('description', ''))}, None
+
+def handle_append_transaction(payload):
+    if READ_ONLY_DATA:
+        return {"response": "Adding transactions isn't available while the server runs multiple workers."}, 409
+    if not payload.get('permissions', {}).get('transactions'):
+        return {"response": "You have revoked access to Transactions data. Please enable permissions to proceed."}, 403
+    transaction, message = parse_transaction(payload.get('transaction'))
+    if message:
+        return {"response": message}, 400
+    user_id = payload.get('user_id')
+    user_data, error = resolve_user_data(user_id)
+    if error:
+        return error
+
+    # Appends build on whatever is published at the time and are serialized with reloads
+    with _SWAP_LOCK:
+        if user_data is not None:
+            data = append_transaction(USER_STORE.get(user_id) or user_data, transaction)
+            USER_STORE.put(user_id, data)
+        elif DATA is None:
+            return {"response": "There was a problem loading the financial data files. Please check the server logs."}, 503
+        else:
+            data = append_transaction(DATA, transaction)
+            swap_data(data)
+    return {"response": f"Added a {transaction['type']} of ${transaction['amount']:.2f} on {transaction['date']}.",
+            "balance": round(data['transactions'].rollups.balance, 2)}, 201
+
+def quarterly_spending(data):
+    """Debit totals per category for every quarter, oldest quarter first."""
+    def compute():
+        quarters = {}
+        for (month, category), (debit, _) in list(data['transactions'].rollups.by_category.items()):
+            if debit:
+                year, month_number = month.split('-')
+                quarter = quarters.setdefault(f"{year}-Q{(int(month_number) - 1) // 3 + 1}", {})
+                quarter[category] = quarter.get(category, 0.0) + debit
+        return [
+            {"quarter": quarter, "total": round(sum(categories.values()), 2),
+             "categories": {name: round(amount, 2) for name, amount in sorted(categories.items())}}
+            for quarter, categories in sorted(quarters.items())
+        ]
+    return derived(data, 'quarterly_spending', compute)
+
+def handle_dashboard(payload):
+    """Everything the Streamlit dashboard charts, as structured JSON in one response.
+
+    Each section holds either its data or an 'error' explaining which permission is missing.
+    Optional 'start' / 'end' dates ('YYYY-MM-DD', end exclusive) add a per-category
+    spending breakdown for that range, summed straight from the transaction columns.
+    """
+    permissions = payload.get('permissions', {})
+    start, end = payload.get('start'), payload.get('end')
+    try:
+        if not all(value is None or isinstance(value, str) for value in (start, end)):
+            raise ValueError
+        to_day(start), to_day(end)
+    except ValueError:
+        return {"response": "'start' and 'end' must be dates in 'YYYY-MM-DD' form."}, 400
+    user_data, error = resolve_user_data(payload.get('user_id'))
+    if error:
+        return error
+    data = user_data if user_data is not None else DATA
+    if data is None:
+        return {"response": "There was a problem loading the financial data files. Please check the server logs."}, 503
+
+    if not permissions.get('transactions'):
+        spending = {"error": "You have revoked access to Transactions data. Please enable permissions to proceed."}
+    else:
+        spending = {"quarters": quarterly_spending(data)}
+        if start is not None or end is not None:
+            categories = data['transactions'].totals_by_category('debit', start, end)
+            spending["range"] = {"start": start, "end": end, "total": round(sum(categories.values()), 2),
+                                 "categories": categories}
+
+    if not permissions.get('transactions') or not permissions.get('assets'):
+        forecast = {"error": "To forecast savings, I need access to both your Assets and Transactions data. Please enable permissions to proceed."}
+    elif not data['transactions'].rollups.months():
+        forecast = {"error": "I'm sorry, I don't have enough transaction data to forecast your savings."}
+    else:
+        forecast = {"summary": f"Based on your current trends, here is a forecast of your savings for the next {FORECAST_MONTHS} months...",
+                    "months": savings_forecast(data, FORECAST_MONTHS)}
+
+    return {"spending": spending, "forecast": forecast}, 200
+
+MAX_PROJECTION_MONTHS = 600
+MAX_SCENARIOS = 500
+
+def handle_net_worth_projection(payload):
+    """Returns net-worth and liability series for charts, one per what-if scenario."""
+    permissions = payload.get('permissions', {})
+    if not permissions.get('assets') or not permissions.get('liabilities') or not permissions.get('investments'):
+        return {"response": "To project your net worth, I need access to your Assets, Investments, and Liabilities data."}, 403
+    months = payload.get('months', PROJECTION_MONTHS)
+    if isinstance(months, bool) or not isinstance(months, int) or not 1 <= months <= MAX_PROJECTION_MONTHS:
+        return {"response": f"'months' must be a whole number from 1 to {MAX_PROJECTION_MONTHS}."}, 400
+    scenarios = payload.get('scenarios', [])
+    if not isinstance(scenarios, list) or not all(isinstance(s, dict) for s in scenarios) or len(scenarios) > MAX_SCENARIOS:
+        return {"response": f"'scenarios' must be a list of at most {MAX_SCENARIOS} objects."}, 400
+    user_data, error = resolve_user_data(payload.get('user_id'))
+    if error:
+        return error
+    data = user_data if user_data is not None else DATA
+    if data is None:
+        return {"response": "There was a problem loading the financial data files. Please check the server logs."}, 503
+
+    # The current payment plan is always the first series, for comparison
+    try:
+        projections = net_worth_projection(data, months, [{"name": "Current payments"}] + scenarios)
+    except (TypeError, ValueError, OverflowError):
+        return {"response": "Scenario 'extra_payment' and 'lump_sum' must be finite numbers or {loan: amount} objects."}, 400
+    return {"months": list(range(months + 1)), "scenarios": projections}, 200
+
+@app.route('/query', methods=['POST'])
+def process_user_query():
+    try:
+        body, status = handle_query(request.json)
+        return jsonify(body), status
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return jsonify(SERVER_ERROR), 500
+
+@app.route('/query/batch', methods=['POST'])
+def process_batch_query():
+    try:
+        body, status = handle_batch_query(request.json)
+        return jsonify(body), status
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return jsonify(SERVER_ERROR), 500
+
+@app.route('/transactions', methods=['POST'])
+def add_transaction():
+    try:
+        body, status = handle_append_transaction(request.json)
+        return jsonify(body), status
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return jsonify(SERVER_ERROR), 500
+
+@app.route('/dashboard', methods=['POST'])
+def dashboard():
+    try:
+        body, status = handle_dashboard(request.json)
+        return jsonify(body), status
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return jsonify(SERVER_ERROR), 500
+
+@app.route('/net-worth/projection', methods=['POST'])
+def net_worth_projection_chart():
+    try:
+        body, status = handle_net_worth_projection(request.json)
+        return jsonify(body), status
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return jsonify(SERVER_ERROR), 500
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="AI Personal Finance Assistant backend")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--server', choices=['waitress', 'asgi'], default='waitress',
+                        help="Serve through Waitress's thread pool or an asyncio ASGI event loop")
+    parser.add_argument('--threads', type=int, default=4,
+                        help="Waitress worker threads, or ASGI executor threads for the tools")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Waitress only: pre-forked processes sharing the loaded data (disables POST /transactions)")
+    parser.add_argument('--max-pending', type=int, default=64,
+                        help="ASGI only: requests allowed in flight before new ones get a 503")
+    parser.add_argument('--request-timeout', type=float, default=10.0,
+                        help="ASGI only: seconds before a request is answered with a 504")
+    parser.add_argument('--reload-interval', type=float, default=2.0,
+                        help="Seconds between checks for changed JSON files (0 disables hot reload)")
+    parser.add_argument('--profile-rate', type=float, default=0.0,
+                        help="Fraction of requests to profile with cProfile (0 disables profiling)")
+    parser.add_argument('--profile-dir', default='profiles', help="Where sampled request profiles are written")
+    parser.add_argument('--transactions-file', default=DATA_FILES['transactions'],
+                        help="Transactions export for the shared dataset: month-keyed JSON or NDJSON "
+                             "(one transaction per line). Per-user directories always use their own file")
+    parser.add_argument('--no-snapshot', action='store_true',
+                        help=f"Always parse the JSON files instead of using or writing '{SNAPSHOT_FILE}'")
+    parser.add_argument('--users-dir', default=USERS_DIR,
+                        help="Directory holding one sub-directory of JSON files per user id")
+    parser.add_argument('--user-memory-mb', type=int, default=512,
+                        help="Memory budget for per-user data kept loaded in the LRU, per worker process. "
+                             "User transactions are mapped from users/<id>/data.snapshot, so workers "
+                             "serving the same user share those pages (not with --no-snapshot)")
+    args = parser.parse_args()
+    if args.workers > 1 and args.server != 'waitress':
+        parser.error("--workers needs --server waitress")
+    USE_SNAPSHOT = not args.no_snapshot
+    PROFILER.rate = args.profile_rate
+    PROFILER.directory = args.profile_dir
+    USER_STORE.root = args.users_dir
+    USER_STORE.memory_budget = args.user_memory_mb * 1024 * 1024
+    SHARED_DATA_FILES['transactions'] = args.transactions_file
+    reload_data()
+
+    if DATA is not None and args.workers > 1:
+        from prefork import PreforkServer, listen_socket
+        READ_ONLY_DATA = True
+        SHARED_METRICS = MultiprocessMetrics(METRICS, tempfile.mkdtemp(prefix='finance-metrics-'), STATS_SOURCES)
+        SHARED_METRICS.publish_parent()
+
+        def serve_worker(sock):
+            SHARED_METRICS.start_worker()
+            try:
+                serve(app, sockets=[sock], threads=args.threads)
+            finally:
+                SHARED_METRICS.publish()
+
+        # The parent polls the files itself and restarts the workers onto each new snapshot
+        reloader = DataReloader(SHARED_DATA_FILES, parse_data_file, apply_data_updates, interval=args.reload_interval)
+
+        # The parent's load timings reach /metrics through its own published source
+        def check_reload():
+            changed = reloader.check()
+            SHARED_METRICS.publish_parent()
+            return changed
+
+        def reload():
+            reload_data()
+            SHARED_METRICS.publish_parent()
+
+        print(f"Starting production server with Waitress in {args.workers} worker processes...")
+        try:
+            PreforkServer(serve_worker, listen_socket(args.host, args.port), args.workers,
+                          check_reload=check_reload if args.reload_interval > 0 else None,
+                          reload=reload, reload_interval=args.reload_interval,
+                          on_worker_exit=SHARED_METRICS.retire).run()
+        finally:
+            shutil.rmtree(SHARED_METRICS.directory, ignore_errors=True)
+    elif DATA is not None:
+        if args.reload_interval > 0:
+            DataReloader(SHARED_DATA_FILES, parse_data_file, apply_data_updates, interval=args.reload_interval).start()
+        if args.server == 'asgi':
+            from asgi_app import AsgiApp, serve_asgi
+            routes = {
+                ('POST', '/query'): handle_query,
+                ('POST', '/query/batch'): handle_batch_query,
+                ('POST', '/transactions'): handle_append_transaction,
+                ('POST', '/net-worth/projection'): handle_net_worth_projection,
+                ('POST', '/dashboard'): handle_dashboard,
+                ('GET', '/cache/stats'): lambda payload: (combined_stats('cache'), 200),
+                ('GET', '/users/stats'): lambda payload: (combined_stats('users'), 200),
+                ('GET', '/metrics'): lambda payload: (render_metrics(), 200),
+            }
+            # Handlers run on executor threads, so sampled profiles are taken there
+            routes = {route: (lambda handler, path: lambda payload: PROFILER.run(path, handler, payload))(handler, route[1])
+                      for route, handler in routes.items()}
+
+            def record_asgi_request(path, status, seconds):
+                endpoint = path if any(path == route_path for _, route_path in routes) else 'unmatched'
+                REQUESTS_TOTAL.inc(endpoint, status)
+                REQUEST_SECONDS.observe(seconds, endpoint)
+
+            asgi_app = AsgiApp(routes, max_workers=args.threads, max_pending=args.max_pending,
+                               timeout=args.request_timeout, error_body=SERVER_ERROR, on_response=record_asgi_request)
+            print("Starting ASGI server...")
+            serve_asgi(asgi_app, host=args.host, port=args.port)
+        else:
+            print("Starting production server with Waitress...")
+            serve(app, host=args.host, port=args.port, threads=args.threads)
+    else:
         print("Could not start server because data loading failed. Please check the JSON files.")
\ No newline at end of file
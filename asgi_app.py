@@ -0,0 +1,150 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_BODY_BYTES = 1024 * 1024
+
+CORS_HEADERS = [
+    (b'access-control-allow-origin', b'*'),
+    (b'access-control-allow-headers', b'content-type'),
+    (b'access-control-allow-methods', b'GET, POST, OPTIONS'),
+]
+
+
+class AsgiApp:
+    """Minimal ASGI front end for the same request handlers the Flask app serves.
+
+    routes maps (method, path) to a handler taking the decoded JSON payload and
+    returning (body, status). Handlers run on a bounded thread pool so the event
+    loop only ever waits on sockets. Once max_pending requests are in flight new
+    ones are turned away with a 503, and a handler that takes longer than
+    timeout seconds is answered with a 504. A timed-out handler can't be
+    stopped, so its request keeps its slot until the handler really finishes;
+    otherwise stuck work would pile up in the executor's queue unchecked.
+    """
+
+    def __init__(self, routes, max_workers=4, max_pending=64, timeout=10.0, error_body=None, on_response=None):
+        self.routes = routes
+        self.on_response = on_response  # (path, status, seconds), called after every response
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.error_body = error_body or {"response": "Sorry, something went wrong on our end. Please try again."}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asgi-tool")
+        self.pending = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        started = time.perf_counter()
+
+        async def respond(status, body, extra_headers=()):
+            await self._respond(send, status, body, extra_headers)
+            if self.on_response is not None:
+                self.on_response(scope['path'], status, time.perf_counter() - started)
+
+        method = scope['method']
+        if method == 'OPTIONS':
+            await respond(204, None)
+            return
+        handler = self.routes.get((method, scope['path']))
+        if handler is None:
+            await respond(404, {"response": "Not found."})
+            return
+        if self.pending >= self.max_pending:
+            await respond(503, {"response": "The server is busy. Please try again shortly."},
+                          extra_headers=[(b'retry-after', b'1')])
+            return
+
+        self.pending += 1
+        submitted = False
+        try:
+            body = await self._read_body(receive)
+            if body is None:
+                await respond(413, {"response": "Request body is too large."})
+                return
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError:
+                await respond(400, {"response": "Request body must be JSON."})
+                return
+
+            loop = asyncio.get_running_loop()
+            future = self.executor.submit(handler, payload)
+            submitted = True
+            future.add_done_callback(lambda _: self._release(loop))
+            try:
+                result, status = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+            except asyncio.TimeoutError:
+                # A handler still queued is cancelled; a running one finishes and its result is dropped.
+                await respond(504, {"response": "The request took too long. Please try again."})
+                return
+            except Exception as e:
+                print(f"An error occurred: {e}")
+                await respond(500, self.error_body)
+                return
+            await respond(status, result)
+        finally:
+            if not submitted:
+                self.pending -= 1
+
+    def _release(self, loop):
+        """Frees a request's slot once its handler is done; runs on the executor thread."""
+        def release():
+            self.pending -= 1
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            # The loop already closed at shutdown
+            pass
+
+    async def _read_body(self, receive):
+        """Reads the whole request body, or returns None once it exceeds MAX_BODY_BYTES."""
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body'):
+                break
+        return b''.join(chunks)
+
+    async def _respond(self, send, status, body, extra_headers=()):
+        # Plain strings (like /metrics) are sent as text, everything else as JSON
+        if isinstance(body, str):
+            payload, content_type = body.encode('utf-8'), b'text/plain; version=0.0.4'
+        else:
+            payload, content_type = b'' if body is None else json.dumps(body).encode('utf-8'), b'application/json'
+        headers = [(b'content-type', content_type), (b'content-length', str(len(payload)).encode())]
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': headers + CORS_HEADERS + list(extra_headers)})
+        await send({'type': 'http.response.body', 'body': payload})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def serve_asgi(asgi_app, host='0.0.0.0', port=5000):
+    """Runs the app under uvicorn's event loop."""
+    try:
+        import uvicorn
+    except ImportError:
+        print("The ASGI server needs uvicorn. Install it with 'pip install uvicorn'.")
+        return
+    uvicorn.run(asgi_app, host=host, port=port, log_level="warning")
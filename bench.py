@@ -0,0 +1,238 @@
+"""Micro-benchmarks for the hot paths of app.py and finance_engine.py.
+
+    python bench.py                      # run and compare against bench_baseline.json
+    python bench.py --save-baseline      # record the current numbers as the baseline
+    python bench.py --max-exponent 6     # include the 10^6 datasets
+
+Each benchmark runs over synthetic data from 10^2 up to 10^max-exponent rows
+(transactions, bills or queries). Time is the best of --repeat runs; peak
+memory is measured in a separate run under tracemalloc. Any result more than
+--tolerance slower (or heavier) than the baseline is reported as a regression
+and the script exits with status 1.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import app
+import finance_engine
+import synthetic_data
+from personal_ledger import PersonalLedger
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+ALL_PERMISSIONS = {name: True for name in ["assets", "liabilities", "transactions", "epf", "credit", "investments"]}
+
+BENCHMARKS = []  # (name, setup); setup(size) returns the callable that gets timed
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def query_corpus(size, phrases, rng):
+    """`size` queries built from known phrases plus filler words, with some typos mixed in."""
+    filler = ["my", "what", "is", "the", "please", "show", "me", "last", "month", "total"]
+    queries = []
+    for _ in range(size):
+        words = rng.sample(filler, rng.randint(0, 3)) + rng.choice(phrases).split()
+        if rng.random() < 0.3:
+            i = rng.randrange(len(words))
+            words[i] = words[i][:-1] or words[i]
+        rng.shuffle(words)
+        queries.append(" ".join(words))
+    return queries
+
+
+@benchmark("app.get_intent")
+def bench_get_intent(size):
+    phrases = [k for keywords in app.INTENT_MAP.values() for k in keywords] + ["hello", "what is my epf balance"]
+    queries = query_corpus(size, phrases, random.Random(size))
+
+    def run():
+        app.INTENT_INDEX.clear_cache()  # Time classification, not the memo
+        for query in queries:
+            app.get_intent(query)
+    return run
+
+
+def synthetic_snapshot(size):
+    directory = tempfile.mkdtemp(prefix="bench-data-")
+    try:
+        synthetic_data.write_dataset(directory, size, random.Random(size))
+        return app.load_data(directory)
+    finally:
+        shutil.rmtree(directory)
+
+
+@benchmark("app.get_insights")
+def bench_get_insights(size):
+    data = synthetic_snapshot(size)
+    queries = ["spending", "savings forecast", "net worth", "credit score", "loan payoff"]
+
+    def run():
+        # Uncached: every answer is recomputed from the snapshot
+        app.ANSWER_CACHE.clear()
+        data['derived'] = {}
+        for query in queries:
+            app.get_insights(query, ALL_PERMISSIONS, data)
+    return run
+
+
+@benchmark("app.load_data")
+def bench_load_data(size):
+    directory = tempfile.mkdtemp(prefix="bench-data-")
+    synthetic_data.write_dataset(directory, size, random.Random(size))
+
+    def run():
+        # Always parse the JSON; the snapshot path is measured separately below
+        app.USE_SNAPSHOT = False
+        try:
+            if app.load_data(directory) is None:
+                raise RuntimeError("load_data failed on the synthetic dataset")
+        finally:
+            app.USE_SNAPSHOT = True
+    run.cleanup = lambda: shutil.rmtree(directory)
+    return run
+
+
+@benchmark("app.load_data (snapshot)")
+def bench_load_data_snapshot(size):
+    directory = tempfile.mkdtemp(prefix="bench-data-")
+    synthetic_data.write_dataset(directory, size, random.Random(size))
+    app.load_data(directory)  # Writes the snapshot the timed runs map
+
+    def run():
+        if app.load_data(directory) is None:
+            raise RuntimeError("load_data failed on the synthetic snapshot")
+    run.cleanup = lambda: shutil.rmtree(directory)
+    return run
+
+
+@benchmark("finance_engine.analyze_and_respond")
+def bench_analyze_and_respond(size):
+    phrases = list(finance_engine.HANDLERS) + ["something unrelated"]
+    queries = query_corpus(size, phrases, random.Random(size))
+    ledger = PersonalLedger()
+
+    def run():
+        for query in queries:
+            finance_engine.analyze_and_respond(query, [], ledger)
+    return run
+
+
+@benchmark("finance_engine.top5_last_purchases")
+def bench_top5_last_purchases(size):
+    rng = random.Random(size)
+    start = date(2020, 1, 1)
+    ledger = PersonalLedger()
+    for i in range(size):
+        ledger.add_purchase(start + timedelta(days=rng.randrange(2000)), f"Item {i}", rng.randint(10, 20000))
+
+    def run():
+        finance_engine.top5_last_purchases(ledger)
+    return run
+
+
+@benchmark("finance_engine.bills_due_next_week")
+def bench_bills_due_next_week(size):
+    ledger = PersonalLedger(bills=synthetic_data.generate_bills(size, start=date.today() - timedelta(days=180),
+                                                                rng=random.Random(size)))
+
+    def run():
+        finance_engine.bills_due_next_week(ledger)
+    return run
+
+
+def measure(run, repeat):
+    """Returns (best seconds, peak traced bytes) for one benchmark callable."""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def compare(results, baseline, tolerance):
+    """Returns a list of regression messages."""
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            if previous[metric] > 0 and result[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f"{key}: {metric} {result[metric]:.6g} vs baseline {previous[metric]:.6g} "
+                                   f"(+{(result[metric] / previous[metric] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark intent classification, tools and data loading")
+    parser.add_argument('--max-exponent', type=int, default=5, help="Largest dataset is 10^N rows (default 5)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per benchmark; the best one counts")
+    parser.add_argument('--only', help="Run only benchmarks whose name contains this text")
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help="Write these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="Allowed slowdown before failing (0.5 = +50%%)")
+    parser.add_argument('--output', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    sizes = [10 ** n for n in range(2, args.max_exponent + 1)]
+    results = {}
+    print(f"{'benchmark':<48}{'size':>10}{'time ms':>12}{'peak KiB':>12}")
+    for name, setup in BENCHMARKS:
+        if args.only and args.only not in name:
+            continue
+        for size in sizes:
+            run = setup(size)
+            try:
+                seconds, peak = measure(run, args.repeat)
+            finally:
+                getattr(run, 'cleanup', lambda: None)()
+            results[f"{name}[{size}]"] = {"seconds": seconds, "peak_bytes": peak}
+            print(f"{name:<48}{size:>10}{seconds * 1000:>12.3f}{peak / 1024:>12.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    if regressions:
+        print("\nREGRESSIONS against the baseline:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+    print("\nNo regressions against the baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
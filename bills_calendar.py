@@ -0,0 +1,102 @@
+import calendar
+import datetime
+import threading
+from bisect import bisect_left, bisect_right
+
+# Months between occurrences of a recurring bill.
+RECURRENCE_MONTHS = {"monthly": 1, "quarterly": 3, "yearly": 12}
+
+# How far past a query window recurring bills are expanded, so nearby queries reuse the work.
+EXPANSION_DAYS = 90
+
+
+def add_months(date, months):
+    """Same day `months` later, clamped to the end of shorter months (Jan 31 -> Feb 28)."""
+    month_index = date.month - 1 + months
+    year, month = date.year + month_index // 12, month_index % 12 + 1
+    return date.replace(year=year, month=month, day=min(date.day, calendar.monthrange(year, month)[1]))
+
+
+class BillsCalendar:
+    """Date-ordered index of bills for window queries with bisect.
+
+    Due dates are parsed once. One-off bills live in one sorted list; recurring
+    bills ('recurrence': 'monthly' / 'quarterly' / 'yearly') are expanded into a
+    second sorted list only as far as queries have needed, so a window query
+    costs O(log n + k) once expanded. Queries expand the index too, so adds
+    and queries are serialized by one lock.
+    """
+
+    def __init__(self, bills=()):
+        self._once = []  # sorted (due date, name)
+        self._recurring = []  # [name, first due date, months between, occurrences expanded]
+        self._repeats = []  # sorted (due date, name) occurrences of recurring bills
+        self._expanded_until = None  # occurrences before this date are in _repeats
+        self._lock = threading.Lock()
+        for bill in bills:
+            self.add(bill)
+
+    def add(self, bill):
+        due = datetime.date.fromisoformat(bill["due_date"])
+        recurrence = bill.get("recurrence")
+        with self._lock:
+            if recurrence:
+                entry = [bill["name"], due, RECURRENCE_MONTHS[recurrence], 0]
+                self._recurring.append(entry)
+                if self._expanded_until is not None:
+                    self._expand_one(entry, self._expanded_until)
+                    self._repeats.sort()
+            else:
+                item = (due, bill["name"])
+                self._once.insert(bisect_right(self._once, item), item)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._once) + len(self._recurring)
+
+    def _expand_one(self, entry, until):
+        name, first, step, count = entry
+        due = add_months(first, step * count)
+        while due < until:
+            self._repeats.append((due, name))
+            count += 1
+            due = add_months(first, step * count)
+        entry[3] = count
+
+    def _expand(self, until):
+        """Makes sure every recurring occurrence before `until` is in _repeats; call with the lock held."""
+        if not self._recurring or (self._expanded_until is not None and until <= self._expanded_until):
+            return
+        until = until + datetime.timedelta(days=EXPANSION_DAYS)
+        start = len(self._repeats)
+        for entry in self._recurring:
+            self._expand_one(entry, until)
+        # New occurrences all fall after the old horizon, so only the new tail needs sorting.
+        self._repeats[start:] = sorted(self._repeats[start:])
+        self._expanded_until = until
+
+    @staticmethod
+    def _window(items, start, end):
+        lo = bisect_left(items, (start,))
+        hi = bisect_left(items, (end,))
+        return items[lo:hi]
+
+    def due_between(self, start, end):
+        """Bills due on start <= date < end, as (due date, name) in date order."""
+        with self._lock:
+            self._expand(end)
+            return sorted(self._window(self._once, start, end) + self._window(self._repeats, start, end))
+
+    def due_within(self, days, today=None):
+        """Bills due in the `days` days starting today, so due_within(7) covers today through day 6."""
+        today = today or datetime.date.today()
+        return self.due_between(today, today + datetime.timedelta(days=days))
+
+    def overdue(self, today=None):
+        """One-off bills whose due date has passed.
+
+        Recurring bills have no paid/unpaid state, so past occurrences aren't reported.
+        """
+        today = today or datetime.date.today()
+        with self._lock:
+            return self._once[:bisect_left(self._once, (today,))]
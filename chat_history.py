@@ -0,0 +1,49 @@
+import json
+import zlib
+from collections import deque
+
+
+class ChatHistory:
+    """Bounded conversation store for the Streamlit chat apps.
+
+    The newest messages are kept as plain dicts. Once more than
+    recent_size + page_size of them pile up, the oldest page_size are packed
+    into one zlib-compressed JSON page, and at most max_pages pages are
+    kept; older ones are dropped. Renders and the engine only ever read a
+    fixed-size tail, so a rerun costs the same on the hundredth turn as on
+    the first.
+    """
+
+    def __init__(self, recent_size=100, page_size=50, max_pages=40, context_size=10):
+        self.recent_size = recent_size
+        self.page_size = page_size
+        self.context_size = context_size
+        self.recent = deque()
+        self.pages = deque(maxlen=max_pages)  # compressed, oldest first
+        self.dropped = 0
+
+    def append(self, role, content):
+        self.recent.append({"role": role, "content": content})
+        if len(self.recent) >= self.recent_size + self.page_size:
+            page = [self.recent.popleft() for _ in range(self.page_size)]
+            if len(self.pages) == self.pages.maxlen:
+                self.dropped += self.page_size
+            self.pages.append(zlib.compress(json.dumps(page).encode('utf-8')))
+
+    def __len__(self):
+        """Messages still stored, recent and archived."""
+        return len(self.recent) + len(self.pages) * self.page_size
+
+    def last(self, n):
+        """The newest n stored messages, oldest first; only decompresses the pages it needs."""
+        messages = list(self.recent)[-n:] if n > 0 else []
+        for page in reversed(self.pages):
+            if len(messages) >= n:
+                break
+            older = json.loads(zlib.decompress(page).decode('utf-8'))
+            messages = older[max(0, len(older) - (n - len(messages))):] + messages
+        return messages
+
+    def context(self):
+        """The fixed-size window of recent turns handed to the response engine."""
+        return self.last(self.context_size)
@@ -0,0 +1,9 @@
+# Dataset name -> JSON file it is loaded from, shared by app.py, PersonalLedger and the data generators
+DATA_FILES = {
+    'transactions': 'Transactions Data.json',
+    'credit': 'Credit Data.json',
+    'assets': 'Assets Data.json',
+    'epf': 'EPF DATA.json',
+    'investments': 'Investments data.json',
+    'liabilities': 'liabilites.json',
+}
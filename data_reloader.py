@@ -0,0 +1,56 @@
+import os
+import threading
+
+
+def file_signature(path):
+    """Returns (mtime_ns, size) for a file, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class DataReloader(threading.Thread):
+    """Background thread that polls data files and re-parses only the ones that changed.
+
+    Parsing happens on this thread, never on a request thread. Once every
+    changed file parsed cleanly, on_change({key: parsed}) is called so the
+    caller can swap in a new snapshot in a single assignment. A file that
+    fails to parse (e.g. an export still being written) keeps its old data
+    and is tried again the next time it changes.
+    """
+
+    def __init__(self, files, parse, on_change, interval=2.0):
+        super().__init__(name="data-reloader", daemon=True)
+        self.files = dict(files)  # key -> path
+        self.parse = parse  # (key, path) -> parsed value
+        self.on_change = on_change
+        self.interval = interval
+        self._seen = {key: file_signature(path) for key, path in self.files.items()}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.check()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def check(self):
+        """Polls once; returns the keys that were reloaded."""
+        updates = {}
+        for key, path in self.files.items():
+            signature = file_signature(path)
+            if signature is None or signature == self._seen[key]:
+                continue
+            self._seen[key] = signature
+            try:
+                updates[key] = self.parse(key, path)
+            except Exception as e:
+                print(f"Error: could not reload '{path}', keeping the previous data: {e}")
+
+        if updates:
+            self.on_change(updates)
+            print(f"Reloaded data files: {', '.join(sorted(updates))}")
+        return sorted(updates)
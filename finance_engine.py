@@ -1,193 +1,218 @@
-import datetime
-import random
-import time
-
-# Sample datasets for demonstration
-salary_history = [
-    {"month": "Jan 2025", "amount": 50000},
-    {"month": "Feb 2025", "amount": 50000},
-    {"month": "Mar 2025", "amount": 52000},
-]
-
-expenses = [
-    {"date": "2025-09-03", "category": "grocery", "amount": 2100},
-    {"date": "2025-09-05", "category": "travel", "amount": 8000},
-    {"date": "2025-09-06", "category": "grocery", "amount": 1100}
-]
-
-budget = {"travel": 10000}  # Budget limits by category
-savings_this_year = 120000
-
-bills = [
-    {"name": "Internet", "due_date": "2025-09-17"},
-    {"name": "Credit Card", "due_date": "2025-09-15"},
-]
-
-goals = {"Emergency_fund": {"target": 50000, "current": 35000}}
-
-transactions = [
-    {"item": "Phone", "amount": 18000, "date": "2025-09-09"},
-    {"item": "Groceries", "amount": 2100, "date": "2025-09-03"},
-    {"item": "Shoes", "amount": 7000, "date": "2025-08-21"},
-]
-
-assets = 350000
-liabilities = 120000
-
-def show_salary_history():
-    return f"My salary history is: {salary_history[0]['amount']}, {salary_history[1]['amount']}, {salary_history[2]['amount']}"
-
-def analyze_grocery_spending():
-    total = sum(x["amount"] for x in expenses if x["category"] == "grocery")
-    return f"Total grocery spending this month: ₹{total}"
-
-def travel_budget_status():
-    travel = sum(x["amount"] for x in expenses if x["category"] == "travel")
-    if travel < budget["travel"]:
-        return f"Travel spending ₹{travel} is within the budget of ₹{budget['travel']}."
-    else:
-        return f"Travel spending ₹{travel} exceeds the budget!"
-
-def saved_this_year():
-    return f"You have saved ₹{savings_this_year} this year."
-
-def bills_due_next_week():
-    today = datetime.date.today()
-    next_week = today + datetime.timedelta(days=7)
-    due_bills = [b for b in bills if datetime.datetime.strptime(b["due_date"], "%Y-%m-%d").date() < next_week]
-    if not due_bills:
-        return "No bills due next week."
-    return f"Bills due next week: {', '.join([b['name'] for b in due_bills])}"
-
-def emergency_fund_progress():
-    percent = (goals["Emergency_fund"]["current"] / goals["Emergency_fund"]["target"]) * 100
-    return f"Emergency fund progress: {percent:.0f}% completed"
-
-def top5_last_purchases():
-    # Sort transactions by date (most recent first)
-    sorted_transactions = sorted(transactions, key=lambda x: x["date"], reverse=True)
-    top_5 = sorted_transactions[:5]
-    return f"Your last purchases are: {[x['item'] for x in top_5]}"
-
-def net_worth_today():
-    return f"Your net worth today: ₹{assets - liabilities}"
-
-def money_saving_suggestions():
-    return "Consider a budget plan, reduce eating out, and invest in high-yield savings accounts."
-    
-def loan_info():
-    return "Loans are a sum of money borrowed from a financial institution. You have to repay the borrowed amount with interest over a set period of time."
-    
-def personal_finance_info():
-    return "Personal finance is the management of your money and financial decisions, including budgeting, saving, and investing."
-    
-def credit_score_info():
-    return "A credit score is a number that represents your creditworthiness, which lenders use to evaluate the risk of lending money to you. A higher score is better."
-
-def hi():
-    return "Hi, How can I help you with your Finance?"
-    
-def hii():
-    return "Hii, How can I help you with your Finance?"
-    
-def hello():
-    return "Hello, How can I help you with your Finance?"
-    
-def hellow():
-    return "Hellow, How can I help you with your Finance?"
-
-def hey():
-    return "Hey, How can I help you with your Finance?"
-
-def heyy():
-    return "Heyy, How can I help you with your Finance?"
-
-def heyyy():
-    return "Heyyy, How can I help you with your Finance?"
-    
-def namaste():
-    return "Namaste, How can I help you with your Finance?"
-    
-def hy():
-    return "Hy, How can I help you with your Finance?"
-
-def hyy():
-    return "Hyy, How can I help you with your Finance?"
-
-def hyyy():
-    return "Hyyy, How can I help you with your Finance?"
-
-def thanks():
-    return "Welcome, let me know if you want any other help"
-
-def ok_thanks():
-    return "Welcome, let me know if you want any other help"
-
-def bye():
-    return "Bye, If you have any more questions or need help for anything else, feel free to ask"
-
-def last_month_expenses():
-    # This is a placeholder since the data is not available.
-    return "Last month's expenses were around ₹17000.00."
-
-# This is the main function that your Streamlit app will call.
-def analyze_and_respond(user_query, chat_history):
-    query = user_query.lower()
-    
-    # Use a simple dispatcher to route the query to the correct function.
-    if "salary history" in query:
-        return show_salary_history()
-    elif "grocery spending" in query:
-        return analyze_grocery_spending()
-    elif "travel budget" in query:
-        return travel_budget_status()
-    elif "saved this year" in query:
-        return saved_this_year()
-    elif "bills due" in query:
-        return bills_due_next_week()
-    elif "emergency fund" in query:
-        return emergency_fund_progress()
-    elif "last purchases" in query:
-        return top5_last_purchases()
-    elif "net worth" in query:
-        return net_worth_today()
-    elif "saving suggestions" in query:
-        return money_saving_suggestions()
-    elif "loan" in query:
-        return loan_info()
-    elif "personal finance" in query:
-        return personal_finance_info()
-    elif "credit score" in query:
-        return credit_score_info()
-    elif "hi" in query:
-        return hi()
-    elif "hii" in query:
-        return hii()
-    elif "hello" in query:
-        return hello()
-    elif "hellow" in query:
-        return hellow()
-    elif "hey" in query:
-        return hey()
-    elif "heyy" in query:
-        return heyy()
-    elif "heyyy" in query:
-        return heyyy()
-    elif "namaste" in query:
-        return namaste()
-    elif "hy" in query:
-        return hy()
-    elif "hyy" in query:
-        return hyy()
-    elif "hyyy" in query:
-        return hyyy()
-    elif "thanks" in query:
-        return thanks()
-    elif "ok thanks" in query:
-        return ok_thanks()
-    elif "bye" in query:
-        return bye()
-    elif "last month" in query:
-        return last_month_expenses()
-    else:
-        return "I'm sorry, I cannot answer that yet. Please ask one of the predefined questions."
+import datetime
+import random
+import re
+import time
+
+from personal_ledger import PersonalLedger
+
+# What a new ledger starts with until the user sets their own; the data files have no budgets, goals or bills
+DEFAULT_BUDGET = {"transport": 10000}  # Monthly budget limits by (lowercased) category
+DEFAULT_GOALS = {"Emergency_fund": {"target": 50000, "current": 35000}}
+DEFAULT_BILLS = [
+    {"name": "Internet", "due_date": "2025-09-17", "recurrence": "monthly"},
+    {"name": "Credit Card", "due_date": "2025-09-15"},
+]
+
+def load_ledger(base_dir='.'):
+    """A fresh ledger built from the JSON data files in base_dir, one per user or session."""
+    return PersonalLedger.from_files(base_dir, budget=DEFAULT_BUDGET, goals=DEFAULT_GOALS, bills=DEFAULT_BILLS)
+
+def _month_label(month):
+    """'2025-08' -> 'August 2025'."""
+    return datetime.date(int(month[:4]), int(month[5:7]), 1).strftime('%B %Y')
+
+# Every handler takes the ledger it answers from. The latest month with any
+# expenses stands in for "this month" and "last month", as in app.py.
+def show_salary_history(ledger):
+    return f"My salary history is: {', '.join(str(x['amount']) for x in ledger.salary_history)}"
+
+# The data files put groceries under 'Food' and travel costs under 'Transport'.
+def analyze_grocery_spending(ledger):
+    month = ledger.latest_month
+    if month is None:
+        return "I don't have any spending recorded yet."
+    total = ledger.category_total("food", month)
+    return f"Total grocery and food spending in {_month_label(month)}: ₹{total}"
+
+def travel_budget_status(ledger):
+    month = ledger.latest_month
+    if month is None:
+        return "I don't have any spending recorded yet."
+    travel, limit = ledger.budget_status("transport", month)
+    if limit is None:
+        return f"Travel spending in {_month_label(month)} is ₹{travel}; you haven't set a travel budget."
+    if travel < limit:
+        return f"Travel spending ₹{travel} in {_month_label(month)} is within the budget of ₹{limit}."
+    else:
+        return f"Travel spending ₹{travel} in {_month_label(month)} exceeds the budget!"
+
+def saved_this_year(ledger):
+    return f"You have saved ₹{ledger.savings_this_year} this year."
+
+def bills_due_next_week(ledger):
+    due_bills = ledger.bills.due_within(7)
+    if not due_bills:
+        return "No bills due next week."
+    return f"Bills due next week: {', '.join(name for _, name in due_bills)}"
+
+def overdue_bills(ledger):
+    late = ledger.bills.overdue()
+    if not late:
+        return "You have no overdue bills."
+    return f"Overdue bills: {', '.join(f'{name} (due {due:%d %b})' for due, name in late)}"
+
+def emergency_fund_progress(ledger):
+    percent = ledger.goal_progress("Emergency_fund")
+    if percent is None:
+        return "You haven't set up an emergency fund goal yet."
+    return f"Emergency fund progress: {percent:.0f}% completed"
+
+def top5_last_purchases(ledger):
+    top_5 = ledger.recent_purchases(5)
+    return f"Your last purchases are: {[x['item'] for x in top_5]}"
+
+def net_worth_today(ledger):
+    return f"Your net worth today: ₹{ledger.net_worth}"
+
+def money_saving_suggestions(ledger):
+    return "Consider a budget plan, reduce eating out, and invest in high-yield savings accounts."
+    
+def loan_info(ledger):
+    return "Loans are a sum of money borrowed from a financial institution. You have to repay the borrowed amount with interest over a set period of time."
+    
+def personal_finance_info(ledger):
+    return "Personal finance is the management of your money and financial decisions, including budgeting, saving, and investing."
+    
+def credit_score_info(ledger):
+    return "A credit score is a number that represents your creditworthiness, which lenders use to evaluate the risk of lending money to you. A higher score is better."
+
+def hi(ledger):
+    return "Hi, How can I help you with your Finance?"
+    
+def hii(ledger):
+    return "Hii, How can I help you with your Finance?"
+    
+def hello(ledger):
+    return "Hello, How can I help you with your Finance?"
+    
+def hellow(ledger):
+    return "Hellow, How can I help you with your Finance?"
+
+def hey(ledger):
+    return "Hey, How can I help you with your Finance?"
+
+def heyy(ledger):
+    return "Heyy, How can I help you with your Finance?"
+
+def heyyy(ledger):
+    return "Heyyy, How can I help you with your Finance?"
+    
+def namaste(ledger):
+    return "Namaste, How can I help you with your Finance?"
+    
+def hy(ledger):
+    return "Hy, How can I help you with your Finance?"
+
+def hyy(ledger):
+    return "Hyy, How can I help you with your Finance?"
+
+def hyyy(ledger):
+    return "Hyyy, How can I help you with your Finance?"
+
+def thanks(ledger):
+    return "Welcome, let me know if you want any other help"
+
+def ok_thanks(ledger):
+    return "Welcome, let me know if you want any other help"
+
+def bye(ledger):
+    return "Bye, If you have any more questions or need help for anything else, feel free to ask"
+
+def last_month_expenses(ledger):
+    month = ledger.latest_month
+    if month is None:
+        return "I don't have any expenses recorded yet."
+    return f"Your expenses in {_month_label(month)} were ₹{ledger.month_spent(month):.2f}."
+
+# ----------------------------------------------------
+# Dispatch table: phrase -> handler
+# ----------------------------------------------------
+# All phrases are compiled into one regex, so routing is a single scan of the query.
+# When several phrases match, finance questions beat small talk (lower priority
+# number wins), then the longest phrase wins ("ok thanks" over "thanks", "hii"
+# over "hi"), then the one registered first.
+HANDLERS = {}  # phrase -> (handler, priority, registration order)
+_matcher = None
+
+def register_handler(phrase, handler, priority=0):
+    """Routes queries containing `phrase` to `handler`; call again to replace a handler."""
+    global _matcher
+    phrase = phrase.lower()
+    order = HANDLERS[phrase][2] if phrase in HANDLERS else len(HANDLERS)
+    HANDLERS[phrase] = (handler, priority, order)
+    _matcher = None  # Recompiled on the next query
+
+def _compile_matcher():
+    """One pattern per priority, most preferred first.
+
+    Longest alternatives come first, inside a lookahead so overlapping matches
+    are all seen. A lookahead only reports one phrase per start position, so
+    phrases of different priorities get separate patterns: a preferred phrase
+    that is a prefix of a less preferred, longer one is still found.
+    """
+    tiers = {}
+    for phrase, (_, priority, _) in HANDLERS.items():
+        tiers.setdefault(priority, []).append(phrase)
+    return [re.compile("(?=(" + "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True)) + "))")
+            for _, phrases in sorted(tiers.items())]
+
+def find_handler(query):
+    """Returns the handler for a lowercased query, or None if no phrase matches."""
+    global _matcher
+    matcher = _matcher
+    if matcher is None:
+        matcher = _matcher = _compile_matcher()
+    for tier in matcher:
+        best_rank, best = None, None
+        for match in tier.finditer(query):
+            handler, _, order = HANDLERS[match.group(1)]
+            rank = (-len(match.group(1)), order)
+            if best_rank is None or rank < best_rank:
+                best_rank, best = rank, handler
+        if best is not None:
+            return best
+    return None
+
+for _phrase, _handler in [
+    ("salary history", show_salary_history),
+    ("grocery spending", analyze_grocery_spending),
+    ("travel budget", travel_budget_status),
+    ("saved this year", saved_this_year),
+    ("bills due", bills_due_next_week),
+    ("overdue", overdue_bills),
+    ("emergency fund", emergency_fund_progress),
+    ("last purchases", top5_last_purchases),
+    ("net worth", net_worth_today),
+    ("saving suggestions", money_saving_suggestions),
+    ("loan", loan_info),
+    ("personal finance", personal_finance_info),
+    ("credit score", credit_score_info),
+    ("last month", last_month_expenses),
+]:
+    register_handler(_phrase, _handler)
+
+# Greetings and thanks only answer when no finance question matched.
+for _phrase, _handler in [
+    ("hi", hi), ("hii", hii), ("hello", hello), ("hellow", hellow),
+    ("hey", hey), ("heyy", heyy), ("heyyy", heyyy), ("namaste", namaste),
+    ("hy", hy), ("hyy", hyy), ("hyyy", hyyy),
+    ("thanks", thanks), ("ok thanks", ok_thanks), ("bye", bye),
+]:
+    register_handler(_phrase, _handler, priority=1)
+
+# This is the main function that your Streamlit app will call.
+def analyze_and_respond(user_query, chat_history, ledger):
+    handler = find_handler(user_query.lower())
+    if handler is None:
+        return "I'm sorry, I cannot answer that yet. Please ask one of the predefined questions."
+    return handler(ledger)
@@ -0,0 +1,30 @@
+import numpy as np
+
+PERCENTILES = (10, 50, 90)
+
+
+def monthly_flows(rollups):
+    """Returns (income, expenses) arrays with one entry per month that has transactions."""
+    months = rollups.months()
+    income = np.array([rollups.month_total(m, 'credit') for m in months], dtype=np.float64)
+    expenses = np.array([rollups.month_total(m, 'debit') for m in months], dtype=np.float64)
+    return income, expenses
+
+
+def simulate_savings(start_balance, income, expenses, horizon=6, paths=10000, seed=0):
+    """Monte Carlo forecast of the savings balance over the next `horizon` months.
+
+    Monthly income and expenses are each drawn from a normal distribution
+    fitted to every month of history (clipped at zero), for `paths` paths at
+    once as (paths, horizon) arrays. Returns {'p10': ..., 'p50': ..., 'p90': ...},
+    each an array with the balance at the end of every future month.
+    """
+    rng = np.random.default_rng(seed)
+    shape = (paths, horizon)
+    ddof = 1 if len(income) > 1 else 0
+    draws = rng.normal(income.mean(), income.std(ddof=ddof), shape).clip(min=0)
+    draws -= rng.normal(expenses.mean(), expenses.std(ddof=ddof), shape).clip(min=0)
+    balances = np.cumsum(draws, axis=1, out=draws)
+    balances += start_balance
+    bands = np.percentile(balances, PERCENTILES, axis=0)
+    return {f"p{p}": band for p, band in zip(PERCENTILES, bands)}
@@ -0,0 +1,81 @@
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+from fuzzywuzzy import fuzz, utils
+
+
+def normalize(text):
+    """Processes text the way fuzz.token_sort_ratio does: cleaned, lowercased, tokens sorted."""
+    return " ".join(sorted(utils.full_process(text, force_ascii=True).split()))
+
+
+class IntentIndex:
+    """Intent classifier compiled once from an INTENT_MAP-style {intent: [keywords]} dict.
+
+    Gives the same answer as scoring the query against every keyword with
+    fuzz.token_sort_ratio, but only scores a shortlist: keywords sharing a
+    token with the query are scored first (via an inverted index), and the
+    rest are skipped whenever a character-count upper bound on their score
+    can't beat the best match found so far.
+    """
+
+    def __init__(self, intent_map, threshold=60, exact_intents=None, cache_size=4096):
+        self.threshold = threshold
+        # Intents that win outright when one of their words appears in the query.
+        self.exact_intents = [(intent, frozenset(words)) for intent, words in (exact_intents or {}).items()]
+
+        self._keywords = []  # (intent, normalized keyword, character counts), in INTENT_MAP order
+        self._postings = defaultdict(list)  # token -> positions of the keywords containing it
+        for intent, keywords in intent_map.items():
+            for keyword in keywords:
+                text = normalize(keyword)
+                position = len(self._keywords)
+                self._keywords.append((intent, text, Counter(text)))
+                for token in set(text.split()):
+                    self._postings[token].append(position)
+
+        self._normalize = lru_cache(maxsize=cache_size)(self._normalize_query)
+        self._match = lru_cache(maxsize=cache_size)(self._best_match)
+
+    def classify(self, query):
+        """Returns the intent for a query, or 'unknown' if nothing scores above the threshold."""
+        words, text = self._normalize(query)
+        for intent, keywords in self.exact_intents:
+            if not keywords.isdisjoint(words):
+                return intent
+        return self._match(text)
+
+    @staticmethod
+    def _normalize_query(query):
+        query_lower = query.lower()
+        return frozenset(query_lower.split()), normalize(query_lower)
+
+    def _best_match(self, text):
+        counts = Counter(text)
+        shortlist = {p for token in text.split() for p in self._postings.get(token, ())}
+        rest = (p for p in range(len(self._keywords)) if p not in shortlist)
+
+        # Ties go to the keyword that comes first in INTENT_MAP, like the linear scan did.
+        best_score, best_position = self.threshold, None
+        for position in (*sorted(shortlist), *rest):
+            intent, keyword, keyword_counts = self._keywords[position]
+            total = len(text) + len(keyword)
+            if total and text != keyword:
+                # Matching characters can't exceed the characters the two strings share.
+                shared = sum((counts & keyword_counts).values())
+                bound = utils.intr(200 * shared / total)
+                if bound < best_score or (bound == best_score and (best_position is None or position > best_position)):
+                    continue
+            score = fuzz.ratio(text, keyword)
+            if score > best_score or (score == best_score and best_position is not None and position < best_position):
+                best_score, best_position = score, position
+
+        return 'unknown' if best_position is None else self._keywords[best_position][0]
+
+    def clear_cache(self):
+        self._normalize.cache_clear()
+        self._match.cache_clear()
+
+    def cache_info(self):
+        """Returns the lru_cache statistics of the query normalizer and the matcher."""
+        return {'normalize': self._normalize.cache_info(), 'match': self._match.cache_info()}
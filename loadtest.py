@@ -0,0 +1,284 @@
+"""Load generator for the backend's HTTP endpoints.
+
+    python loadtest.py --spawn --transactions 100000 --duration 30 --concurrency 64
+
+Runs a fixed number of concurrent asyncio clients over keep-alive connections
+and records the latency of every request, labelled by the intent it asked for
+(or 'batch' / 'dashboard'). Prints throughput and p50/p95/p99 per label and
+writes everything to a JSON file so runs can be compared over time.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import synthetic_data
+from data_files import DATA_FILES
+
+PERMISSIONS = ["assets", "liabilities", "transactions", "epf", "credit", "investments"]
+
+# Queries that app.get_intent classifies as each intent
+QUERIES = {
+    'get_total_spending': ["spending", "money out", "total spent", "debits"],
+    'forecast_savings': ["savings forecast", "future savings", "how much can i save"],
+    'calculate_net_worth': ["net worth", "what is my net worth", "financial position"],
+    'get_credit_score': ["credit score", "check my credit", "credit rating"],
+    'project_net_worth_over_time': ["loan payoff", "net worth projection", "debt payoff"],
+    'greeting': ["hello", "hi there"],
+    'unknown': ["what is my EPF balance?", "tell me a joke"],
+}
+
+DEFAULT_QUERY_MIX = "get_total_spending=4,forecast_savings=2,calculate_net_worth=2,get_credit_score=2,project_net_worth_over_time=1,greeting=1,unknown=1"
+DEFAULT_REQUEST_MIX = "query=8,batch=1,dashboard=1"
+
+
+def parse_mix(text):
+    """Parses 'a=3,b=1' into ([names], [weights])."""
+    names, weights = [], []
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        names.append(name.strip())
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Workload:
+    """Picks the next request according to the request, query and permission mixes."""
+
+    def __init__(self, args, rng):
+        self.rng = rng
+        self.request_kinds, self.request_weights = parse_mix(args.request_mix)
+        self.intents, self.intent_weights = parse_mix(args.query_mix)
+        unknown = set(self.intents) - set(QUERIES)
+        if unknown:
+            raise SystemExit(f"Unknown intents in --query-mix: {', '.join(sorted(unknown))}")
+        self.revoke_rate = args.revoke_rate
+        self.users = args.users
+        self.batch_size = args.batch_size
+
+    def permissions(self):
+        return {name: self.rng.random() >= self.revoke_rate for name in PERMISSIONS}
+
+    def query_item(self):
+        intent = self.rng.choices(self.intents, self.intent_weights)[0]
+        return intent, {"query": self.rng.choice(QUERIES[intent]), "permissions": self.permissions()}
+
+    def next_request(self):
+        """Returns (label, path, payload)."""
+        kind = self.rng.choices(self.request_kinds, self.request_weights)[0]
+        if kind == 'batch':
+            label, path = 'batch', '/query/batch'
+            payload = {"items": [self.query_item()[1] for _ in range(self.batch_size)]}
+        elif kind == 'dashboard':
+            label, path, payload = 'dashboard', '/dashboard', {"permissions": self.permissions()}
+        else:
+            label, payload = self.query_item()
+            path = '/query'
+        if self.users:
+            payload["user_id"] = f"user{self.rng.randrange(self.users)}"
+        return label, path, payload
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection that sends JSON POSTs."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def post(self, path, payload):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode('utf-8')
+        self.writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode('ascii') + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("server closed the connection")
+        status = int(status_line.split()[1])
+        length, close = 0, False
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'connection' and value.strip().lower() == 'close':
+                close = True
+        await self.reader.readexactly(length)
+        if close:
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def client(workload, host, port, deadline, remaining, results):
+    connection = Connection(host, port)
+    try:
+        while time.monotonic() < deadline and remaining[0] != 0:
+            remaining[0] -= 1
+            label, path, payload = workload.next_request()
+            started = time.perf_counter()
+            try:
+                status = await connection.post(path, payload)
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+                connection.close()
+                status = None
+            results.append((label, time.perf_counter() - started, status))
+    finally:
+        connection.close()
+
+
+async def run_load(args, workload):
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    results = []
+    # -1 means "until the duration runs out"
+    remaining = [args.requests if args.requests else -1]
+    deadline = time.monotonic() + args.duration
+    started = time.perf_counter()
+    await asyncio.gather(*(client(workload, host, port, deadline, remaining, results)
+                           for _ in range(args.concurrency)))
+    return results, time.perf_counter() - started
+
+
+def summarize(results, elapsed):
+    by_label = {}
+    for label, latency, status in results:
+        by_label.setdefault(label, []).append((latency, status))
+
+    def stats(entries):
+        latencies = sorted(latency * 1000 for latency, _ in entries)
+        errors = sum(1 for _, status in entries if status is None or status >= 500)
+        return {
+            "requests": len(entries),
+            "errors": errors,
+            "throughput_rps": round(len(entries) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "max_ms": round(latencies[-1], 3),
+        }
+
+    return {
+        "overall": stats([(latency, status) for _, latency, status in results]) if results else {},
+        "by_label": {label: stats(entries) for label, entries in sorted(by_label.items())},
+    }
+
+
+def wait_for_server(host, port, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def spawn_server(args):
+    """Generates a dataset and starts app.py on it in a subprocess; returns (process, data dir)."""
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="loadtest-data-")
+    if not os.path.exists(os.path.join(data_dir, DATA_FILES['transactions'])):
+        rng = random.Random(args.seed)
+        synthetic_data.write_dataset(data_dir, args.transactions, rng)
+        for i in range(args.users):
+            synthetic_data.write_dataset(os.path.join(data_dir, 'users', f'user{i}'), args.user_transactions, rng)
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+    url = urlsplit(args.url)
+    command = [sys.executable, app_path, '--host', url.hostname, '--port', str(url.port or 80),
+               '--reload-interval', '0'] + args.server_args.split()
+    # The server reads its JSON files (and users/) from its working directory
+    process = subprocess.Popen(command, cwd=data_dir)
+    if not wait_for_server(url.hostname, url.port or 80):
+        process.terminate()
+        raise SystemExit("The spawned server did not start listening in time.")
+    return process, data_dir
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Put concurrent load on the finance assistant backend")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--concurrency', type=int, default=32, help="Concurrent clients, one connection each")
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds to run")
+    parser.add_argument('--requests', type=int, default=0, help="Stop after this many requests (0 = run for --duration)")
+    parser.add_argument('--request-mix', default=DEFAULT_REQUEST_MIX, help="Weights of query/batch/dashboard requests")
+    parser.add_argument('--query-mix', default=DEFAULT_QUERY_MIX, help="Weights of the intents queries are drawn from")
+    parser.add_argument('--revoke-rate', type=float, default=0.1, help="Chance that each permission is revoked")
+    parser.add_argument('--batch-size', type=int, default=10)
+    parser.add_argument('--users', type=int, default=0, help="Spread requests over user0 .. userN-1 (0 = shared data)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='loadtest_results.json', help="JSON file the results are written to")
+    parser.add_argument('--spawn', action='store_true', help="Generate synthetic data and start app.py on it")
+    parser.add_argument('--data-dir', help="With --spawn: reuse or create the synthetic data here")
+    parser.add_argument('--transactions', type=int, default=10000, help="With --spawn: transactions in the shared dataset")
+    parser.add_argument('--user-transactions', type=int, default=1000, help="With --spawn: transactions per user")
+    parser.add_argument('--server-args', default='', help="With --spawn: extra app.py arguments, e.g. '--server asgi'")
+    args = parser.parse_args()
+
+    workload = Workload(args, random.Random(args.seed))
+    process = None
+    if args.spawn:
+        process, data_dir = spawn_server(args)
+        print(f"Started app.py on {args.url} with data in {data_dir}")
+    try:
+        results, elapsed = asyncio.run(run_load(args, workload))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    summary = summarize(results, elapsed)
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "config": {key: value for key, value in vars(args).items()},
+        "elapsed_seconds": round(elapsed, 3),
+        **summary,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'label':<30}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for label, row in [("overall", summary["overall"])] + list(summary["by_label"].items()):
+        if row:
+            print(f"{label:<30}{row['requests']:>10}{row['errors']:>8}{row['throughput_rps']:>10}"
+                  f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,340 @@
+import cProfile
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from bisect import bisect_left
+
+# Latency buckets in seconds, from sub-millisecond intent matching up to slow loads
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{str(v)}"'.replace("\n", " ") for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def dump(self):
+        """JSON-ready state: [[label values, count], ...]."""
+        with self._lock:
+            return [[list(values), count] for values, count in self._values.items()]
+
+    @staticmethod
+    def merge(dumps):
+        totals = {}
+        for dump in dumps:
+            for values, count in dump:
+                totals[tuple(values)] = totals.get(tuple(values), 0) + count
+        return [[list(values), count] for values, count in totals.items()]
+
+    def render(self, dump=None):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, count in sorted((tuple(v), c) for v, c in (self.dump() if dump is None else dump)):
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {count}")
+        return lines
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, seconds)] += 1
+            series[-1] += seconds
+
+    def time(self, *label_values):
+        """Context manager that observes the time spent inside it."""
+        return _Timer(self, label_values)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def dump(self):
+        """JSON-ready state: [[label values, series], ...]."""
+        with self._lock:
+            return [[list(values), list(series)] for values, series in self._series.items()]
+
+    @staticmethod
+    def merge(dumps):
+        totals = {}
+        for dump in dumps:
+            for values, series in dump:
+                total = totals.get(tuple(values))
+                totals[tuple(values)] = list(series) if total is None else [a + b for a, b in zip(total, series)]
+        return [[list(values), series] for values, series in totals.items()]
+
+    def render(self, dump=None):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, series in sorted((tuple(v), s) for v, s in (self.dump() if dump is None else dump)):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                labels = _format_labels(self.labels + ("le",), values + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback each time metrics are scraped."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, read):
+        self.name, self.help, self.read = name, help_text, read
+
+    def dump(self):
+        return self.read()
+
+    @staticmethod
+    def merge(dumps):
+        return sum(dumps)
+
+    def render(self, dump=None):
+        value = self.read() if dump is None else dump
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", f"{self.name} {value}"]
+
+
+class CallbackCounter(Gauge):
+    """Counter kept elsewhere (e.g. cache hits) and read when metrics are scraped; must only go up."""
+
+    kind = "counter"
+
+
+class _Timer:
+    def __init__(self, histogram, label_values):
+        self.histogram, self.label_values = histogram, label_values
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.label_values)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, help_text, labels=()):
+        return self._add(Counter(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def gauge(self, name, help_text, read):
+        return self._add(Gauge(name, help_text, read))
+
+    def counter_callback(self, name, help_text, read):
+        return self._add(CallbackCounter(name, help_text, read))
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def reset(self):
+        """Zeroes every counter and histogram; gauges read live values and have nothing to reset."""
+        for metric in self.metrics:
+            if hasattr(metric, "reset"):
+                metric.reset()
+
+    def dump(self):
+        """Every metric's current state, JSON-ready, keyed by name."""
+        return {metric.name: metric.dump() for metric in self.metrics}
+
+    def merge(self, dumps, gauges=True):
+        """Combines dumps from several processes; gauges=False leaves point-in-time gauges out."""
+        merged = {}
+        for metric in self.metrics:
+            if metric.kind == "gauge" and not gauges:
+                continue
+            parts = [dump[metric.name] for dump in dumps if metric.name in dump]
+            if parts:
+                merged[metric.name] = metric.merge(parts)
+        return merged
+
+    def render(self, dump=None):
+        """All metrics in the Prometheus text exposition format, from this process or a merged dump."""
+        lines = []
+        for metric in self.metrics:
+            if dump is None:
+                lines.extend(metric.render())
+            elif metric.name in dump:
+                lines.extend(metric.render(dump[metric.name]))
+        return "\n".join(lines) + "\n"
+
+
+class MultiprocessMetrics:
+    """Shares a Registry (and stats dicts) between pre-forked workers through a directory.
+
+    Each worker writes its registry dump and extras (name -> () -> stats
+    dict) to <directory>/<pid>.json every interval seconds and once more on
+    the way out, so whichever worker answers a scrape can merge everyone's.
+    When a worker exits, the parent calls retire() to fold its counters and
+    histograms into retired.json, so totals don't drop on restarts; its
+    gauges and extras go with it. Figures from other workers can be up to
+    interval seconds old.
+
+    Workers start from zero rather than from the registry they inherited at
+    fork, so nothing the parent recorded is counted once per worker. The
+    parent's own observations (data loads and reloads) are published as one
+    more source with publish_parent().
+    """
+
+    RETIRED = "retired.json"
+    PARENT = "parent.json"
+
+    def __init__(self, registry, directory, extras=None, interval=1.0):
+        self.registry = registry
+        self.directory = directory
+        self.extras = dict(extras or {})
+        self.interval = interval
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f"{pid}.json")
+
+    def _write(self, path, state):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    def _read(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def publish(self):
+        """Writes this process's current state for the others to read."""
+        state = {"metrics": self.registry.dump(),
+                 "extras": {name: read() for name, read in self.extras.items()}}
+        self._write(self._path(os.getpid()), state)
+
+    def publish_parent(self):
+        """Writes the supervising parent's metrics; it serves no requests, so it has no extras."""
+        metrics = self.registry.merge([self.registry.dump()], gauges=False)
+        self._write(os.path.join(self.directory, self.PARENT), {"metrics": metrics, "extras": {}})
+
+    def start_worker(self):
+        """Call in each worker right after fork: resets the inherited registry, then
+        publishes now and every interval seconds from a daemon thread."""
+        self.registry.reset()
+        self.publish()
+
+        def loop():
+            while True:
+                time.sleep(self.interval)
+                try:
+                    self.publish()
+                except OSError as e:
+                    print(f"Error: could not publish metrics: {e}")
+
+        threading.Thread(target=loop, daemon=True).start()
+
+    def retire(self, pid):
+        """Folds an exited worker's counters and histograms into the retired totals."""
+        path = self._path(pid)
+        state = self._read(path)
+        if state is not None:
+            retired_path = os.path.join(self.directory, self.RETIRED)
+            dumps = [state["metrics"]] + [d for d in [self._read(retired_path)] if d is not None]
+            self._write(retired_path, self.registry.merge(dumps, gauges=False))
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _live(self):
+        """States of the running workers (this one freshly published) and the parent."""
+        self.publish()
+        states = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json") and name != self.RETIRED:
+                state = self._read(os.path.join(self.directory, name))
+                if state is not None:
+                    states.append(state)
+        return states
+
+    def render(self):
+        dumps = [state["metrics"] for state in self._live()]
+        retired = self._read(os.path.join(self.directory, self.RETIRED))
+        if retired is not None:
+            dumps.append(retired)
+        return self.registry.render(self.registry.merge(dumps))
+
+    def collect(self, name):
+        """The named extra from every running worker."""
+        return [state["extras"][name] for state in self._live() if name in state["extras"]]
+
+
+class ProfileSampler:
+    """Profiles a random sample of requests with cProfile and dumps each one to directory.
+
+    Off unless rate > 0. Dumps are named <timestamp>-<label>-<id>.prof and can
+    be read with pstats or snakeviz.
+    """
+
+    def __init__(self, rate=0.0, directory="profiles"):
+        self.rate = rate
+        self.directory = directory
+
+    def start(self):
+        """Returns a running profiler for a sampled request, or None."""
+        if self.rate <= 0 or random.random() >= self.rate:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return None
+        return profiler
+
+    def stop(self, profiler, label):
+        if profiler is None:
+            return
+        profiler.disable()
+        os.makedirs(self.directory, exist_ok=True)
+        safe_label = "".join(c if c.isalnum() else "_" for c in label).strip("_") or "request"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_label}-{uuid.uuid4().hex[:8]}.prof"
+        profiler.dump_stats(os.path.join(self.directory, name))
+
+    def run(self, label, func, *args):
+        profiler = self.start()
+        try:
+            return func(*args)
+        finally:
+            self.stop(profiler, label)
@@ -0,0 +1,149 @@
+import datetime
+import json
+import os
+from bisect import bisect_left, insort
+from itertools import islice
+
+from bills_calendar import BillsCalendar
+from data_files import DATA_FILES
+from stream_loader import iter_month_rows, iter_ndjson_rows
+
+
+def _day(value):
+    """ISO 'YYYY-MM-DD' string for a date or string, so dates compare as text."""
+    return value.isoformat() if isinstance(value, datetime.date) else value
+
+
+class PersonalLedger:
+    """One user's expenses, purchases, bills, budgets and goals, indexed for finance_engine.
+
+    Expense totals per category (overall and per month) are kept running as
+    expenses are added, so budget and category questions are dict lookups.
+    Purchases are kept in one date-ordered list: the latest k are a tail
+    slice and a date range is two bisects, O(log n + k). Goals are updated in
+    place as money is put towards them, and bills live in a BillsCalendar.
+    """
+
+    def __init__(self, salary_history=(), savings_this_year=0, assets=0, liabilities=0,
+                 budget=None, goals=None, bills=()):
+        self.salary_history = list(salary_history)  # [{"month": "Jan 2025", "amount": ...}]
+        self.savings_this_year = savings_this_year
+        self.assets = assets
+        self.liabilities = liabilities
+        self.budget = dict(budget or {})  # category -> limit
+        self.goals = {name: dict(goal) for name, goal in (goals or {}).items()}  # name -> {"target", "current"}
+        self.bills = BillsCalendar(bills)
+        self.category_totals = {}  # category -> total spent
+        self.monthly_totals = {}  # ('YYYY-MM', category) -> total spent
+        self.spent_by_month = {}  # 'YYYY-MM' -> total spent across categories
+        self.latest_month = None  # newest 'YYYY-MM' with an expense
+        self._purchases = []  # sorted (date, -sequence, item, amount)
+        self._sequence = 0
+
+    @classmethod
+    def from_files(cls, base_dir='.', files=DATA_FILES, budget=None, goals=None, bills=()):
+        """Builds a ledger from the same JSON files app.py loads.
+
+        Every debit becomes an expense in its (lowercased) category and a
+        purchase named by its description. Income credits make up the salary
+        history, savings this year are credits minus debits in the latest
+        year on record, and assets/liabilities are totalled like app.py's
+        net worth. Budgets, goals and bills aren't part of those files and
+        are passed in.
+        """
+        def read(key):
+            with open(os.path.join(base_dir, files[key]), 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        assets = read('assets')
+        ledger = cls(
+            assets=(assets.get('bank_balance', 0) + assets.get('cash', 0)
+                    + sum(inv['total_value'] for inv in read('investments').values())
+                    + read('epf').get('balance', 0)),
+            liabilities=sum(loan['outstanding_balance'] for loan in read('liabilities').values()),
+            budget=budget, goals=goals, bills=bills,
+        )
+
+        path = os.path.join(base_dir, files['transactions'])
+        rows = iter_ndjson_rows(path) if path.endswith('.ndjson') else iter_month_rows(path)
+        salary = {}  # 'YYYY-MM' -> income that month
+        net_by_year = {}
+        for _, t in rows:
+            day, amount = t['date'], float(t['amount'])
+            if t['type'] == 'debit':
+                ledger.add_expense(day, t.get('category', 'Other').lower(), amount)
+                ledger.add_purchase(day, t.get('description', 'Purchase'), amount)
+                net_by_year[day[:4]] = net_by_year.get(day[:4], 0.0) - amount
+            else:
+                if t.get('category') == 'Income':
+                    salary[day[:7]] = salary.get(day[:7], 0.0) + amount
+                net_by_year[day[:4]] = net_by_year.get(day[:4], 0.0) + amount
+        ledger.salary_history = [
+            {"month": datetime.date(int(month[:4]), int(month[5:7]), 1).strftime('%b %Y'), "amount": amount}
+            for month, amount in sorted(salary.items())
+        ]
+        ledger.savings_this_year = round(net_by_year[max(net_by_year)], 2) if net_by_year else 0
+        return ledger
+
+    def add_expense(self, date, category, amount):
+        date = _day(date)
+        self.category_totals[category] = self.category_totals.get(category, 0) + amount
+        month = date[:7]
+        key = (month, category)
+        self.monthly_totals[key] = self.monthly_totals.get(key, 0) + amount
+        self.spent_by_month[month] = self.spent_by_month.get(month, 0) + amount
+        if self.latest_month is None or month > self.latest_month:
+            self.latest_month = month
+
+    def add_purchase(self, date, item, amount):
+        # Same-day purchases come back in the order they were added
+        self._sequence += 1
+        insort(self._purchases, (_day(date), -self._sequence, item, amount))
+
+    def category_total(self, category, month=None):
+        """Spent in a category overall, or in one 'YYYY-MM' month."""
+        if month is None:
+            return self.category_totals.get(category, 0)
+        return self.monthly_totals.get((month, category), 0)
+
+    def month_spent(self, month):
+        """Spent across every category in one 'YYYY-MM' month."""
+        return self.spent_by_month.get(month, 0)
+
+    def set_budget(self, category, limit):
+        self.budget[category] = limit
+
+    def budget_status(self, category, month=None):
+        """Returns (spent, limit), overall or in one month; limit is None when the category has no budget."""
+        return self.category_total(category, month), self.budget.get(category)
+
+    def set_goal(self, name, target, current=0):
+        self.goals[name] = {"target": target, "current": current}
+
+    def contribute(self, name, amount):
+        self.goals[name]["current"] += amount
+
+    def goal_progress(self, name):
+        """Percent of the goal reached, or None if there is no such goal."""
+        goal = self.goals.get(name)
+        if goal is None:
+            return None
+        return goal["current"] / goal["target"] * 100
+
+    def recent_purchases(self, k=5):
+        """The k most recent purchases as {"item", "amount", "date"}, newest first."""
+        return [{"item": item, "amount": amount, "date": date}
+                for date, _, item, amount in islice(reversed(self._purchases), k)]
+
+    def purchases_between(self, start, end):
+        """Purchases dated start <= date < end, oldest first."""
+        lo = bisect_left(self._purchases, (_day(start),))
+        hi = bisect_left(self._purchases, (_day(end),))
+        return [{"item": item, "amount": amount, "date": date} for date, _, item, amount in self._purchases[lo:hi]]
+
+    def __len__(self):
+        return len(self._purchases)
+
+    @property
+    def net_worth(self):
+        return self.assets - self.liabilities
@@ -0,0 +1,136 @@
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+
+def listen_socket(host, port, backlog=1024):
+    """Binds the socket every worker accepts on."""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """Forks `workers` processes that all serve the same listening socket.
+
+    Everything the parent loaded before forking is shared with the workers
+    copy-on-write: the NumPy transaction columns (or the mapped snapshot) are
+    never written to, so their pages stay shared, and gc.freeze() keeps the
+    collector from touching every object header in each child. Each worker
+    has its own interpreter and GIL, so throughput scales with cores.
+
+    The parent only supervises. It restarts workers that die, and when
+    check_reload() reports new data (or on SIGHUP, after reload()) it
+    replaces the workers one at a time, so the new ones inherit the new
+    snapshot while the rest keep serving. SIGTERM/SIGINT stop everything.
+    """
+
+    def __init__(self, serve_worker, sock, workers, check_reload=None, reload=None, reload_interval=2.0,
+                 on_worker_exit=None):
+        self.serve_worker = serve_worker  # sock -> serves until SystemExit
+        self.sock = sock
+        self.workers = workers
+        self.check_reload = check_reload  # () -> truthy when new data was loaded
+        self.reload = reload  # () -> None, forced reload on SIGHUP
+        self.reload_interval = reload_interval
+        self.on_worker_exit = on_worker_exit  # pid -> None, after a worker is gone
+        self.pids = []
+        self._stopping = False
+        self._hangup = False
+
+    def spawn(self):
+        gc.freeze()
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+                signal.signal(signal.SIGINT, signal.default_int_handler)
+                signal.signal(signal.SIGHUP, signal.SIG_IGN)
+                self.serve_worker(self.sock)
+            except BaseException as e:
+                if not isinstance(e, (SystemExit, KeyboardInterrupt)):
+                    print(f"Worker {os.getpid()} crashed: {e}")
+                    status = 1
+            finally:
+                # Never fall back into the parent's supervisor loop
+                os._exit(status)
+        self.pids.append(pid)
+        return pid
+
+    def stop_worker(self, pid):
+        try:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+        if pid in self.pids:
+            self.pids.remove(pid)
+            self._exited(pid)
+
+    def _exited(self, pid):
+        if self.on_worker_exit is not None:
+            self.on_worker_exit(pid)
+
+    def restart_workers(self):
+        """Starts each replacement before stopping the worker it replaces."""
+        for pid in list(self.pids):
+            self.spawn()
+            self.stop_worker(pid)
+
+    def reap(self):
+        """Restarts workers that exited on their own, unless the server is stopping."""
+        while self.pids:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in self.pids:
+                self.pids.remove(pid)
+                self._exited(pid)
+                if self._stopping:
+                    continue
+                print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, starting a new one")
+                self.spawn()
+
+    def _request_stop(self, *_):
+        self._stopping = True
+
+    def _request_reload(self, *_):
+        self._hangup = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGHUP, self._request_reload)
+        for _ in range(self.workers):
+            self.spawn()
+        print(f"Started {self.workers} workers: {', '.join(map(str, self.pids))}")
+
+        next_check = time.monotonic() + self.reload_interval
+        try:
+            while not self._stopping:
+                time.sleep(0.5)
+                self.reap()
+                if self._hangup:
+                    self._hangup = False
+                    if self.reload is not None:
+                        self.reload()
+                    self.restart_workers()
+                elif self.check_reload is not None and time.monotonic() >= next_check:
+                    next_check = time.monotonic() + self.reload_interval
+                    if self.check_reload():
+                        self.restart_workers()
+        finally:
+            for pid in list(self.pids):
+                self.stop_worker(pid)
+            self.sock.close()
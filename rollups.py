@@ -0,0 +1,93 @@
+from bisect import insort
+
+import numpy as np
+
+# Index of each transaction type in the [debit, credit] pairs below; matches transaction_store's type codes.
+KIND_INDEX = {'debit': 0, 'credit': 1}
+
+
+class Rollups:
+    """Materialized per-month and per-category totals with a running balance.
+
+    Built once from the store's columns with vectorized group-bys. Each
+    appended transaction gets a shallow copy with O(1) updates, so tools
+    never rescan rows.
+    Months are 'YYYY-MM' strings and every total is a [debit, credit] pair.
+    """
+
+    def __init__(self):
+        self.monthly = {}  # month -> [debit, credit]
+        self.by_category = {}  # (month, category) -> [debit, credit]
+        self.totals = [0.0, 0.0]
+        self._sorted_months = []
+
+    @classmethod
+    def from_columns(cls, dates, amounts, types, category_codes, categories):
+        rollups = cls()
+        if not len(dates):
+            return rollups
+        months, month_index = np.unique(dates.astype('datetime64[M]'), return_inverse=True)
+        n_categories = max(len(categories), 1)
+        cells = month_index * n_categories + category_codes
+        for code in (0, 1):
+            weights = np.where(types == code, amounts, 0.0)
+            sums = np.bincount(cells, weights=weights, minlength=len(months) * n_categories)
+            for cell in np.flatnonzero(sums):
+                month = str(months[cell // n_categories])
+                category = categories[cell % n_categories]
+                rollups.by_category.setdefault((month, category), [0.0, 0.0])[code] += float(sums[cell])
+                rollups.monthly.setdefault(month, [0.0, 0.0])[code] += float(sums[cell])
+                rollups.totals[code] += float(sums[cell])
+        rollups._sorted_months = sorted(rollups.monthly)
+        return rollups
+
+    def to_dict(self):
+        """JSON-ready form, used by the binary snapshot."""
+        return {
+            "monthly": self.monthly,
+            "by_category": [[month, category, debit, credit]
+                            for (month, category), (debit, credit) in self.by_category.items()],
+            "totals": self.totals,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        rollups = cls()
+        rollups.monthly = {month: list(pair) for month, pair in state["monthly"].items()}
+        rollups.by_category = {(month, category): [debit, credit]
+                               for month, category, debit, credit in state["by_category"]}
+        rollups.totals = list(state["totals"])
+        rollups._sorted_months = sorted(rollups.monthly)
+        return rollups
+
+    def copy(self):
+        """Shallow copy; add() replaces pairs instead of changing them, so the copies stay independent."""
+        rollups = Rollups()
+        rollups.monthly = dict(self.monthly)
+        rollups.by_category = dict(self.by_category)
+        rollups.totals = list(self.totals)
+        rollups._sorted_months = list(self._sorted_months)
+        return rollups
+
+    def add(self, month, category, kind, amount):
+        """Folds one transaction into every rollup."""
+        i = KIND_INDEX[kind]
+        if month not in self.monthly:
+            insort(self._sorted_months, month)
+        for totals, key in ((self.monthly, month), (self.by_category, (month, category))):
+            pair = list(totals.get(key, (0.0, 0.0)))
+            pair[i] += amount
+            totals[key] = pair
+        self.totals[i] += amount
+
+    def months(self):
+        """Months that have transactions, oldest first."""
+        return self._sorted_months
+
+    def month_total(self, month, kind):
+        return self.monthly.get(month, (0.0, 0.0))[KIND_INDEX[kind]]
+
+    @property
+    def balance(self):
+        """Credits minus debits over every transaction."""
+        return self.totals[1] - self.totals[0]
@@ -0,0 +1,127 @@
+import json
+import mmap
+import os
+
+import numpy as np
+
+from data_reloader import file_signature
+from rollups import Rollups
+from transaction_store import TransactionStore
+
+MAGIC = b'FINSNAP1'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# Transaction columns in the order they are written, with their fixed-width dtypes
+COLUMNS = (
+    ('dates', 'datetime64[D]'),
+    ('amounts', '<f8'),
+    ('types', 'i1'),
+    ('category_codes', '<i4'),
+)
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_snapshot(path, data, sources):
+    """Writes a loaded snapshot to path as one binary file.
+
+    The file is MAGIC, an 8-byte header length, a JSON header (source file
+    signatures, the small datasets, categories, rollups and column offsets)
+    and then each transaction column as raw fixed-width values, aligned so
+    it can be memory-mapped in place. sources maps dataset name -> the
+    (path, signature) it was parsed from; the signature should be taken
+    before parsing so a file that changed mid-load reads as stale later.
+    The file is written next to path and renamed into place, so readers
+    never see a partial snapshot.
+    """
+    store = data['transactions']
+    columns = store.columns()
+    header = {
+        "format": FORMAT_VERSION,
+        "sources": {key: [source_path, list(signature)] for key, (source_path, signature) in sources.items()},
+        "datasets": {key: value for key, value in data.items()
+                     if key not in ('transactions', 'version', 'derived')},
+        "categories": list(store.categories),
+        "rollups": store.rollups.to_dict(),
+        "rows": len(columns[0]),
+        "columns": [],
+    }
+    # Offsets are relative to the end of the header, so they don't depend on the header's own length
+    offset = 0
+    for (name, dtype), column in zip(COLUMNS, columns):
+        header["columns"].append({"name": name, "dtype": dtype, "offset": offset})
+        offset = _aligned(offset + column.nbytes)
+    header_bytes = json.dumps(header).encode('utf-8')
+    start = _aligned(len(MAGIC) + 8 + len(header_bytes))
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(len(header_bytes).to_bytes(8, 'little'))
+            f.write(header_bytes)
+            for spec, column in zip(header["columns"], columns):
+                f.seek(start + spec["offset"])
+                f.write(np.ascontiguousarray(column, dtype=spec["dtype"]).tobytes())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_snapshot(path, sources):
+    """Maps a snapshot written by write_snapshot back into a data dict.
+
+    Returns None when there is no snapshot, it is unreadable, or any source
+    file's current path or signature differs from the one it was built from,
+    so the caller falls back to parsing the JSON. The transaction columns
+    are read-only views of the mapped file: the OS pages them in on demand
+    and shares the pages between every process that maps the same file.
+    """
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        if mapped[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a snapshot file")
+        header_length = int.from_bytes(mapped[len(MAGIC):len(MAGIC) + 8], 'little')
+        header_end = len(MAGIC) + 8 + header_length
+        header = json.loads(mapped[len(MAGIC) + 8:header_end].decode('utf-8'))
+        if header.get("format") != FORMAT_VERSION:
+            raise ValueError(f"unsupported snapshot format {header.get('format')}")
+
+        recorded = header["sources"]
+        for key, source_path in sources.items():
+            signature = file_signature(source_path)
+            if signature is None or recorded.get(key) != [source_path, list(signature)]:
+                mapped.close()
+                return None
+
+        start = _aligned(header_end)
+        rows = header["rows"]
+        columns = []
+        for spec in header["columns"]:
+            dtype = np.dtype(spec["dtype"])
+            offset = start + spec["offset"]
+            if offset + rows * dtype.itemsize > len(mapped):
+                raise ValueError(f"column '{spec['name']}' runs past the end of the file")
+            # frombuffer keeps the mapping alive for as long as any view of it exists
+            columns.append(np.frombuffer(mapped, dtype=dtype, count=rows, offset=offset)
+                           if rows else np.empty(0, dtype=dtype))
+        if len(columns) != len(COLUMNS):
+            raise ValueError(f"expected {len(COLUMNS)} columns, found {len(columns)}")
+        data = dict(header["datasets"])
+        data['transactions'] = TransactionStore(*columns, header["categories"],
+                                                rollups=Rollups.from_dict(header["rollups"]))
+    except (ValueError, TypeError, KeyError, IndexError, AttributeError, UnicodeDecodeError) as e:
+        # Anything malformed means the JSON is parsed again and the snapshot rewritten
+        print(f"Error: ignoring unreadable snapshot '{path}': {type(e).__name__}: {e}")
+        return None
+    return data
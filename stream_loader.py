@@ -0,0 +1,107 @@
+import json
+import re
+
+from transaction_store import TransactionStoreBuilder
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# A single transaction larger than this means the file is malformed, not that we need more text.
+MAX_VALUE_CHARS = 1 << 24
+
+
+class _Reader:
+    """Sliding text buffer over a file, refilled in fixed-size chunks."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Reads one more chunk, dropping text that was already consumed; False at EOF."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Returns the next non-whitespace character without consuming it ('' at EOF)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self.fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, chars):
+        c = self.peek()
+        if c == '' or c not in chars:
+            raise json.JSONDecodeError(f"Expected one of {chars!r}", self.buf, self.pos)
+        self.pos += 1
+        return c
+
+    def value(self):
+        """Decodes the next complete JSON value, reading more text until it fits."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if len(self.buf) - self.pos > MAX_VALUE_CHARS or not self.fill():
+                    raise
+                continue
+            # A number at the very end of the buffer may continue in the next chunk.
+            if end == len(self.buf) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_month_rows(path, chunk_size=1 << 16):
+    """Yields (month key, transaction dict) from a month-keyed 'Transactions Data.json'.
+
+    Only one transaction is decoded at a time, so memory doesn't grow with the
+    size of the file.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _Reader(f, chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            month = reader.value()
+            reader.expect(':')
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    yield month, reader.value()
+                    if reader.expect(',]') == ']':
+                        break
+            if reader.expect(',}') == '}':
+                return
+
+
+def iter_ndjson_rows(path):
+    """Yields (month key, transaction dict) from an NDJSON export with one transaction per line."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                t = json.loads(line)
+                yield t['date'][:7], t
+
+
+def load_transactions(path, chunk_size=1 << 16):
+    """Streams a transactions export (month-keyed JSON or .ndjson) into a TransactionStore."""
+    rows = iter_ndjson_rows(path) if path.endswith('.ndjson') else iter_month_rows(path, chunk_size)
+    builder = TransactionStoreBuilder()
+    for _, t in rows:
+        builder.add(t)
+    return builder.build()
@@ -1,133 +1,175 @@
-import streamlit as st
-import requests
-import json
-import pandas as pd
-
-# Flask server URL
-BACKEND_URL = "http://localhost:5000/query"
-
-# Page config
-st.set_page_config(
-    page_title="AI Personal Finance Assistant",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# --- UI Setup ---
-st.title("💰 AI Personal Finance Assistant")
-st.markdown("Ask me anything about your finances or get AI-powered insights.")
-
-# Sidebar for permissions
-st.sidebar.title("Data Permissions")
-st.sidebar.markdown("Toggle which data you want to grant me access to.")
-
-if 'permissions' not in st.session_state:
-    st.session_state.permissions = {
-        "assets": True,
-        "liabilities": True,
-        "transactions": True,
-        "epf": True,
-        "credit": True,
-        "investments": True
-    }
-
-for key in st.session_state.permissions.keys():
-    st.session_state.permissions[key] = st.sidebar.checkbox(f"Access to {key.capitalize()}", value=st.session_state.permissions[key])
-
-# --- Chat Interface and Demo Flow ---
-st.subheader("Chat Interface")
-if "messages" not in st.session_state:
-    st.session_state.messages = []
-
-# Initial demo messages
-if not st.session_state.messages:
-    st.session_state.messages.append({"role": "assistant", "content": "Hello! I am your personal finance assistant. Ask me anything about your finances."})
-    st.session_state.messages.append({"role": "user", "content": "How much did I spend last month?"})
-    
-    # Simulate a response from the backend for the demo
-    response = requests.post(BACKEND_URL, json={
-        "query": "How much did I spend last month?",
-        "permissions": {"assets": True, "liabilities": True, "transactions": True, "epf": True, "credit": True, "investments": True}
-    })
-    st.session_state.messages.append({"role": "assistant", "content": response.json()['response']})
-
-    st.session_state.messages.append({"role": "assistant", "content": "For this demo, I will now revoke my access to your EPF and Credit data to show how permissions work."})
-    st.session_state.permissions['epf'] = False
-    st.session_state.permissions['credit'] = False
-    st.session_state.messages.append({"role": "user", "content": "What is my EPF balance?"})
-
-    response = requests.post(BACKEND_URL, json={
-        "query": "What is my EPF balance?",
-        "permissions": st.session_state.permissions
-    })
-    st.session_state.messages.append({"role": "assistant", "content": response.json()['response']})
-
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):
-        st.write(message["content"])
-        
-if prompt := st.chat_input("Ask a question..."):
-    st.session_state.messages.append({"role": "user", "content": prompt})
-    with st.chat_message("user"):
-        st.write(prompt)
-    
-    with st.spinner("Thinking..."):
-        try:
-            response = requests.post(BACKEND_URL, json={
-                "query": prompt,
-                "permissions": st.session_state.permissions
-            })
-            
-            assistant_response = response.json()['response']
-            
-            st.session_state.messages.append({"role": "assistant", "content": assistant_response})
-            with st.chat_message("assistant"):
-                st.write(assistant_response)
-        
-        except requests.exceptions.ConnectionError:
-            st.error("Connection Error: Is the Flask backend running?")
-
-# --- Dashboard with Charts ---
-st.subheader("Financial Dashboard")
-
-tab1, tab2 = st.tabs(["Spending", "Savings Forecast"])
-
-with tab1:
-    st.markdown("#### Quarterly Spending Breakdown")
-    try:
-        q1_transactions = requests.post(BACKEND_URL, json={
-            "query": "all transactions",
-            "permissions": st.session_state.permissions
-        }).json()['response']
-
-        if q1_transactions and q1_transactions != "You have revoked access to Transactions data. Please enable permissions to proceed.":
-            # Assuming a simplified hardcoded structure for the prototype
-            spending_data = {
-                "Food": 245.8,
-                "Bills": 448.5,
-                "Shopping": 444.15,
-                "Travel": 555.0
-            }
-            st.bar_chart(pd.DataFrame(spending_data, index=["Amount"]).T)
-        else:
-            st.warning("Please enable Transactions data to view spending charts.")
-    except Exception:
-        st.warning("Could not load spending data. Please ensure the backend is running and permissions are enabled.")
-
-with tab2:
-    st.markdown("#### 6-Month Savings Forecast")
-    try:
-        forecast_response = requests.post(BACKEND_URL, json={
-            "query": "forecast savings",
-            "permissions": st.session_state.permissions
-        }).json()['response']
-        
-        if "forecast" in forecast_response:
-            forecast_data = json.loads(forecast_response.split('\n')[1])
-            df = pd.DataFrame(forecast_data).set_index("month")
-            st.line_chart(df)
-            st.write(forecast_response.split('\n')[0])
-        else:
-            st.warning(forecast_response)
-    except Exception:
-        st.warning("Could not load savings forecast. Please ensure the backend is running and permissions are enabled.")
\ No newline at end of file
+import streamlit as st
+import requests
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from answer_cache import AnswerCache
+from chat_history import ChatHistory
+
+# Flask server URLs
+BACKEND_URL = "http://localhost:5000/query"
+DASHBOARD_URL = "http://localhost:5000/dashboard"
+REQUEST_TIMEOUT = 10
+# Identical (query, permissions) requests within this many seconds are answered from the cache
+RESPONSE_TTL = 60
+# Chat messages rendered per page; older ones load with "Show earlier messages"
+HISTORY_PAGE = 20
+
+# Page config
+st.set_page_config(
+    page_title="AI Personal Finance Assistant",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# --- Backend Calls ---
+# One keep-alive connection pool, request thread pool and response cache per server process,
+# shared by every session and rerun
+@st.cache_resource
+def backend_session():
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_resource
+def backend_pool():
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="backend")
+
+@st.cache_resource
+def response_cache():
+    return AnswerCache(maxsize=256, ttl=RESPONSE_TTL)
+
+def post_json(url, payload):
+    """POSTs payload, reusing a cached response for the same url and payload.
+
+    Server errors raise instead of being cached, so the next rerun tries again.
+    """
+    key = (url, payload.get("query"), tuple(sorted(payload["permissions"].items())))
+
+    def fetch():
+        response = backend_session().post(url, json=payload, timeout=REQUEST_TIMEOUT)
+        if response.status_code >= 500:
+            response.raise_for_status()
+        return response.json()
+    return response_cache().get_or_compute(key, fetch)
+
+def ask_backend(query, permissions):
+    return post_json(BACKEND_URL, {"query": query, "permissions": dict(permissions)})['response']
+
+def fetch_dashboard(permissions):
+    return post_json(DASHBOARD_URL, {"permissions": dict(permissions)})
+
+# --- UI Setup ---
+st.title("💰 AI Personal Finance Assistant")
+st.markdown("Ask me anything about your finances or get AI-powered insights.")
+
+# Sidebar for permissions
+st.sidebar.title("Data Permissions")
+st.sidebar.markdown("Toggle which data you want to grant me access to.")
+
+if 'permissions' not in st.session_state:
+    st.session_state.permissions = {
+        "assets": True,
+        "liabilities": True,
+        "transactions": True,
+        "epf": True,
+        "credit": True,
+        "investments": True
+    }
+
+for key in st.session_state.permissions.keys():
+    st.session_state.permissions[key] = st.sidebar.checkbox(f"Access to {key.capitalize()}", value=st.session_state.permissions[key])
+
+# --- Chat Interface and Demo Flow ---
+st.subheader("Chat Interface")
+if "history" not in st.session_state:
+    st.session_state.history = ChatHistory()
+    st.session_state.history_shown = HISTORY_PAGE
+history = st.session_state.history
+
+# Initial demo messages
+demo_answers = None
+if not history:
+    all_permissions = {"assets": True, "liabilities": True, "transactions": True, "epf": True, "credit": True, "investments": True}
+    # The demo revokes EPF and Credit before its second question
+    st.session_state.permissions['epf'] = False
+    st.session_state.permissions['credit'] = False
+    demo_answers = [
+        backend_pool().submit(ask_backend, "How much did I spend last month?", all_permissions),
+        backend_pool().submit(ask_backend, "What is my EPF balance?", dict(st.session_state.permissions)),
+    ]
+
+# The dashboard only depends on the permissions, so it loads while the chat is answered
+dashboard_request = backend_pool().submit(fetch_dashboard, dict(st.session_state.permissions))
+
+if demo_answers is not None:
+    history.append("assistant", "Hello! I am your personal finance assistant. Ask me anything about your finances.")
+    history.append("user", "How much did I spend last month?")
+    history.append("assistant", demo_answers[0].result())
+
+    history.append("assistant", "For this demo, I will now revoke my access to your EPF and Credit data to show how permissions work.")
+    history.append("user", "What is my EPF balance?")
+    history.append("assistant", demo_answers[1].result())
+
+# Only the most recent messages are rendered; earlier ones are paged in on demand
+if len(history) > st.session_state.history_shown and st.button("Show earlier messages"):
+    st.session_state.history_shown += HISTORY_PAGE
+for message in history.last(st.session_state.history_shown):
+    with st.chat_message(message["role"]):
+        st.write(message["content"])
+        
+if prompt := st.chat_input("Ask a question..."):
+    history.append("user", prompt)
+    with st.chat_message("user"):
+        st.write(prompt)
+    
+    with st.spinner("Thinking..."):
+        try:
+            assistant_response = ask_backend(prompt, st.session_state.permissions)
+            
+            history.append("assistant", assistant_response)
+            with st.chat_message("assistant"):
+                st.write(assistant_response)
+        
+        except requests.exceptions.ConnectionError:
+            st.error("Connection Error: Is the Flask backend running?")
+        except requests.exceptions.HTTPError:
+            st.error("The backend ran into a problem answering that. Please try again.")
+
+# --- Dashboard with Charts ---
+st.subheader("Financial Dashboard")
+
+tab1, tab2 = st.tabs(["Spending", "Savings Forecast"])
+
+# Both charts come from one request; the server returns ready-to-chart JSON
+try:
+    dashboard = dashboard_request.result()
+except Exception:
+    dashboard = None
+
+with tab1:
+    st.markdown("#### Quarterly Spending Breakdown")
+    if dashboard is None:
+        st.warning("Could not load spending data. Please ensure the backend is running and permissions are enabled.")
+    elif "error" in dashboard["spending"]:
+        st.warning("Please enable Transactions data to view spending charts.")
+    elif not dashboard["spending"]["quarters"]:
+        st.info("No spending recorded yet.")
+    else:
+        quarters = dashboard["spending"]["quarters"]
+        labels = [q["quarter"] for q in quarters]
+        selected = st.selectbox("Quarter", labels, index=len(labels) - 1)
+        spending_data = quarters[labels.index(selected)]["categories"]
+        st.bar_chart(pd.DataFrame(spending_data, index=["Amount"]).T)
+
+with tab2:
+    st.markdown("#### 6-Month Savings Forecast")
+    if dashboard is None:
+        st.warning("Could not load savings forecast. Please ensure the backend is running and permissions are enabled.")
+    elif "error" in dashboard["forecast"]:
+        st.warning(dashboard["forecast"]["error"])
+    else:
+        df = pd.DataFrame(dashboard["forecast"]["months"]).set_index("month")
+        st.line_chart(df)
+        st.write(dashboard["forecast"]["summary"])
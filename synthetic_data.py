@@ -0,0 +1,103 @@
+"""Writes synthetic versions of the backend's JSON data files at any size.
+
+    python synthetic_data.py OUT_DIR --transactions 100000 --users 50
+
+OUT_DIR gets the same six files app.py loads, and with --users also a
+users/<user_id>/ directory per user for the multi-tenant /query mode.
+"""
+import argparse
+import json
+import os
+import random
+from datetime import date, timedelta
+
+from data_files import DATA_FILES
+
+DEBIT_CATEGORIES = {
+    'Food': ('Groceries', 'Restaurant', 'Coffee'),
+    'Housing': ('Rent',),
+    'Shopping': ('Online Shopping', 'Clothes'),
+    'Utilities': ('Utilities Bill', 'Internet'),
+    'Entertainment': ('Movie Tickets', 'Streaming'),
+    'Transport': ('Fuel', 'Taxi'),
+    'Gifts': ('Gift',),
+}
+
+
+def generate_transactions(count, start=date(2020, 1, 1), rng=random):
+    """Returns a month-keyed dict like 'Transactions Data.json' with `count` rows in date order.
+
+    Roughly one row in twenty is a salary credit; the rest are debits spread
+    over a day range that grows with the row count.
+    """
+    days = max(30, count // 10)
+    offsets = sorted(rng.randrange(days) for _ in range(count))
+    months = {}
+    for offset in offsets:
+        day = start + timedelta(days=offset)
+        if rng.random() < 0.05:
+            row = {"date": day.isoformat(), "description": "Salary", "amount": round(rng.uniform(2000, 3000), 2),
+                   "type": "credit", "category": "Income"}
+        else:
+            category = rng.choice(list(DEBIT_CATEGORIES))
+            row = {"date": day.isoformat(), "description": rng.choice(DEBIT_CATEGORIES[category]),
+                   "amount": round(rng.uniform(5, 900), 2), "type": "debit", "category": category}
+        months.setdefault(day.strftime('%B-%Y').lower(), []).append(row)
+    return months
+
+
+def generate_bills(count, start=date(2025, 1, 1), rng=random):
+    """Returns a list of bill dicts, about a third of them recurring."""
+    bills = []
+    for i in range(count):
+        bill = {"name": f"Bill {i}", "due_date": (start + timedelta(days=rng.randrange(365))).isoformat()}
+        if rng.random() < 0.3:
+            bill["recurrence"] = rng.choice(["monthly", "quarterly"])
+        bills.append(bill)
+    return bills
+
+
+def generate_dataset(transactions=1000, rng=random):
+    """Returns {dataset name: JSON-ready value} for all six files."""
+    return {
+        'transactions': generate_transactions(transactions, rng=rng),
+        'credit': {"score": rng.randint(550, 850), "rating": rng.choice(["Fair", "Good", "Excellent"])},
+        'assets': {"bank_balance": rng.randint(1000, 100000), "cash": rng.randint(0, 5000)},
+        'epf': {"contributions": 15000, "employer_match": 12000, "balance": rng.randint(10000, 500000)},
+        'investments': {
+            name: {"total_value": rng.randint(1000, 200000), "gain_loss": rng.randint(-5000, 20000)}
+            for name in ("stocks", "mutual_funds", "bonds")
+        },
+        'liabilities': {
+            "home_loan": {"outstanding_balance": rng.randint(100000, 500000), "interest_rate": 0.04, "monthly_payment": 2500},
+            "credit_card": {"outstanding_balance": rng.randint(0, 10000), "interest_rate": 0.2, "minimum_payment": 150},
+            "personal_loan": {"outstanding_balance": rng.randint(0, 20000), "interest_rate": 0.07, "monthly_payment": 400},
+        },
+    }
+
+
+def write_dataset(directory, transactions=1000, rng=random):
+    os.makedirs(directory, exist_ok=True)
+    for key, value in generate_dataset(transactions, rng=rng).items():
+        with open(os.path.join(directory, DATA_FILES[key]), 'w', encoding='utf-8') as f:
+            json.dump(value, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic financial JSON data files")
+    parser.add_argument('out_dir')
+    parser.add_argument('--transactions', type=int, default=1000, help="Transactions in the shared dataset")
+    parser.add_argument('--users', type=int, default=0, help="Also write users/user0 .. users/userN-1")
+    parser.add_argument('--user-transactions', type=int, default=1000, help="Transactions per user")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    write_dataset(args.out_dir, args.transactions, rng)
+    for i in range(args.users):
+        write_dataset(os.path.join(args.out_dir, 'users', f'user{i}'), args.user_transactions, rng)
+    print(f"Wrote {args.transactions} transactions and {args.users} users to {args.out_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+import datetime
+
+from bills_calendar import BillsCalendar, add_months
+
+D = datetime.date
+
+
+def test_add_months_clamps_to_the_end_of_shorter_months():
+    assert add_months(D(2025, 1, 31), 1) == D(2025, 2, 28)
+    assert add_months(D(2024, 1, 31), 1) == D(2024, 2, 29)
+    assert add_months(D(2025, 1, 31), 3) == D(2025, 4, 30)
+    assert add_months(D(2025, 11, 30), 3) == D(2026, 2, 28)
+    assert add_months(D(2025, 12, 15), 1) == D(2026, 1, 15)
+
+
+def test_recurring_bill_keeps_its_day_after_a_short_month():
+    bills = BillsCalendar([{"name": "Rent", "due_date": "2025-01-31", "recurrence": "monthly"}])
+    assert [due for due, _ in bills.due_between(D(2025, 1, 1), D(2025, 6, 1))] == [
+        D(2025, 1, 31), D(2025, 2, 28), D(2025, 3, 31), D(2025, 4, 30), D(2025, 5, 31)]
+
+
+def test_quarterly_and_yearly_steps():
+    bills = BillsCalendar([{"name": "Tax", "due_date": "2025-02-15", "recurrence": "quarterly"},
+                           {"name": "Insurance", "due_date": "2024-06-01", "recurrence": "yearly"}])
+    assert bills.due_between(D(2025, 1, 1), D(2026, 1, 1)) == [
+        (D(2025, 2, 15), "Tax"), (D(2025, 5, 15), "Tax"), (D(2025, 6, 1), "Insurance"),
+        (D(2025, 8, 15), "Tax"), (D(2025, 11, 15), "Tax")]
+
+
+def test_window_bounds():
+    bills = BillsCalendar([{"name": name, "due_date": f"2025-09-{day:02d}"}
+                           for name, day in [("Before", 9), ("Today", 10), ("Day 6", 16), ("Day 7", 17)]])
+    today = D(2025, 9, 10)
+    # due_within(7) is today through day 6; due_between includes start and excludes end
+    assert bills.due_within(7, today) == [(D(2025, 9, 10), "Today"), (D(2025, 9, 16), "Day 6")]
+    assert bills.due_between(D(2025, 9, 16), D(2025, 9, 17)) == [(D(2025, 9, 16), "Day 6")]
+    assert bills.due_within(0, today) == []
+    assert bills.overdue(today) == [(D(2025, 9, 9), "Before")]
+
+
+def test_recurring_bill_added_after_expansion_is_found():
+    bills = BillsCalendar([{"name": "Internet", "due_date": "2025-01-17", "recurrence": "monthly"}])
+    bills.due_between(D(2025, 1, 1), D(2025, 12, 1))
+    bills.add({"name": "Gym", "due_date": "2025-01-03", "recurrence": "monthly"})
+    assert bills.due_between(D(2025, 11, 1), D(2025, 12, 1)) == [(D(2025, 11, 3), "Gym"), (D(2025, 11, 17), "Internet")]
+    # Querying far past the first expansion extends every recurring bill
+    assert bills.due_between(D(2027, 3, 1), D(2027, 4, 1)) == [(D(2027, 3, 3), "Gym"), (D(2027, 3, 17), "Internet")]
+    assert len(bills) == 2
+
+
+def test_recurring_bills_are_never_overdue():
+    bills = BillsCalendar([{"name": "Internet", "due_date": "2025-01-17", "recurrence": "monthly"}])
+    assert bills.overdue(D(2025, 9, 1)) == []
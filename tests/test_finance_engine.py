@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+import finance_engine
+
+
+@pytest.fixture
+def handlers():
+    """Lets a test register phrases and puts the dispatch table back afterwards."""
+    saved = dict(finance_engine.HANDLERS)
+    yield finance_engine.HANDLERS
+    finance_engine.HANDLERS.clear()
+    finance_engine.HANDLERS.update(saved)
+    finance_engine._matcher = None
+
+
+def brute_force(query):
+    """Every registered phrase the query contains, ranked the way find_handler documents."""
+    best = None
+    for phrase, (handler, priority, order) in finance_engine.HANDLERS.items():
+        if phrase in query:
+            rank = (priority, -len(phrase), order)
+            if best is None or rank < best[0]:
+                best = (rank, handler)
+    return None if best is None else best[1]
+
+
+def test_preferred_phrase_that_prefixes_a_longer_one_is_found(handlers):
+    finance_engine.register_handler("bye now", lambda ledger: "priority 1", priority=1)
+    finance_engine.register_handler("bye n", lambda ledger: "priority 0", priority=0)
+    assert finance_engine.analyze_and_respond("ok bye now", [], None) == "priority 0"
+
+
+def test_matches_brute_force_on_random_queries(handlers):
+    finance_engine.register_handler("bye now", lambda ledger: None, priority=1)
+    finance_engine.register_handler("bye n", lambda ledger: None, priority=0)
+    words = list(handlers) + ["ok", "the", "my", "x", "now", "n"]
+    rng = random.Random(1)
+    for _ in range(5000):
+        query = " ".join(rng.choice(words) for _ in range(rng.randint(1, 5)))
+        if rng.random() < 0.5:
+            query = query.replace(" ", "")
+        assert finance_engine.find_handler(query) is brute_force(query), query
+
+
+def test_unmatched_query_gets_the_fallback_answer():
+    assert finance_engine.analyze_and_respond("xyz", [], None).startswith("I'm sorry")
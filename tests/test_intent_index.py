@@ -0,0 +1,46 @@
+import random
+
+from fuzzywuzzy import fuzz
+
+from intent_index import IntentIndex
+
+INTENT_MAP = {
+    'get_total_spending': ['spending', 'spent', 'debits', 'money out'],
+    'forecast_savings': ['savings forecast', 'future savings', 'how much can i save'],
+    'calculate_net_worth': ['net worth', 'how much i am worth', 'total assets and liabilities', 'financial position'],
+    'get_credit_score': ['credit score', 'credit rating', 'check my credit'],
+    'project_net_worth_over_time': ['net worth projection', 'loan payoff', 'debt payoff', 'when will my loans be paid off'],
+}
+GREETING_KEYWORDS = ['hello', 'hi', 'hey', 'greetings']
+THANKS_KEYWORDS = ['thanks', 'thank you', 'appreciate it']
+
+WORDS = sorted({word for keywords in INTENT_MAP.values() for keyword in keywords for word in keyword.split()}
+               | {'what', 'is', 'my', 'the', 'show', 'me', 'please', 'Net', 'WORTH?', 'spendng', 'credt', 'x', ''})
+
+
+def linear_intent(query):
+    """The per-keyword fuzz.token_sort_ratio scan IntentIndex replaced."""
+    query_lower = query.lower()
+    if any(word in query_lower.split() for word in GREETING_KEYWORDS):
+        return 'greeting'
+    if any(word in query_lower.split() for word in THANKS_KEYWORDS):
+        return 'thanks'
+    best_match_score, best_match_intent = 0, 'unknown'
+    for intent, keywords in INTENT_MAP.items():
+        for keyword in keywords:
+            match_score = fuzz.token_sort_ratio(query_lower, keyword)
+            if match_score > best_match_score and match_score > 60:
+                best_match_score, best_match_intent = match_score, intent
+    return best_match_intent
+
+
+def test_matches_linear_scan_on_random_queries():
+    index = IntentIndex(INTENT_MAP, threshold=60, exact_intents={
+        'greeting': GREETING_KEYWORDS,
+        'thanks': THANKS_KEYWORDS,
+    })
+    rng = random.Random(0)
+    queries = [keyword for keywords in INTENT_MAP.values() for keyword in keywords]
+    queries += [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 6))) for _ in range(2000)]
+    for query in queries:
+        assert index.classify(query) == linear_intent(query), query
@@ -0,0 +1,87 @@
+import json
+import os
+import random
+
+import numpy as np
+import pytest
+
+import snapshot
+import synthetic_data
+from data_files import DATA_FILES
+from data_reloader import file_signature
+from snapshot import read_snapshot, write_snapshot
+from transaction_store import TransactionStore
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """(data, paths, sources) for a small synthetic dataset, with its snapshot written to tmp_path."""
+    synthetic_data.write_dataset(str(tmp_path), transactions=300, rng=random.Random(0))
+    paths = {key: str(tmp_path / name) for key, name in DATA_FILES.items()}
+    sources = {key: (path, file_signature(path)) for key, path in paths.items()}
+    data = {}
+    for key, path in paths.items():
+        with open(path, 'r', encoding='utf-8') as f:
+            value = json.load(f)
+        data[key] = TransactionStore.from_months(value) if key == 'transactions' else value
+    write_snapshot(str(tmp_path / 'data.snapshot'), data, sources)
+    return data, paths, sources
+
+
+def test_round_trip(tmp_path, dataset):
+    data, paths, _ = dataset
+    loaded = read_snapshot(str(tmp_path / 'data.snapshot'), paths)
+    assert loaded is not None
+    for name, column in zip(('dates', 'amounts', 'types', 'category_codes'), data['transactions'].columns()):
+        np.testing.assert_array_equal(getattr(loaded['transactions'], name), column)
+    assert loaded['transactions'].categories == data['transactions'].categories
+    assert loaded['transactions'].rollups.to_dict() == data['transactions'].rollups.to_dict()
+    for key in DATA_FILES:
+        if key != 'transactions':
+            assert loaded[key] == data[key]
+
+
+def test_changed_source_file_makes_the_snapshot_stale(tmp_path, dataset):
+    _, paths, _ = dataset
+    with open(paths['assets'], 'a', encoding='utf-8') as f:
+        f.write(' ')
+    assert read_snapshot(str(tmp_path / 'data.snapshot'), paths) is None
+
+
+def test_different_source_path_makes_the_snapshot_stale(tmp_path, dataset):
+    _, paths, _ = dataset
+    os.rename(paths['epf'], str(tmp_path / 'epf-moved.json'))
+    assert read_snapshot(str(tmp_path / 'data.snapshot'), dict(paths, epf=str(tmp_path / 'epf-moved.json'))) is None
+
+
+def test_corrupt_snapshots_fall_back_instead_of_raising(tmp_path, dataset):
+    _, paths, _ = dataset
+    with open(tmp_path / 'data.snapshot', 'rb') as f:
+        original = f.read()
+    corrupt_path = str(tmp_path / 'corrupt.snapshot')
+    rng = random.Random(0)
+    header_end = len(snapshot.MAGIC) + 8 + int.from_bytes(original[len(snapshot.MAGIC):len(snapshot.MAGIC) + 8], 'little')
+    corruptions = [original[:length] for length in (0, 4, len(snapshot.MAGIC), 20, header_end - 1, header_end, len(original) - 1)]
+    for _ in range(300):
+        flipped = bytearray(original)
+        flipped[rng.randrange(header_end)] ^= 1 << rng.randrange(8)
+        corruptions.append(bytes(flipped))
+    for corrupted in corruptions:
+        with open(corrupt_path, 'wb') as f:
+            f.write(corrupted)
+        # A flip either leaves a readable snapshot or gets it rejected; it must never raise
+        loaded = read_snapshot(corrupt_path, paths)
+        assert loaded is None or isinstance(loaded['transactions'], TransactionStore)
+    with open(corrupt_path, 'wb') as f:
+        f.write(original[:len(original) - 1])
+    assert read_snapshot(corrupt_path, paths) is None
+
+
+def test_failed_write_leaves_no_temporary_file(tmp_path, dataset, monkeypatch):
+    data, _, sources = dataset
+    def fail(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(snapshot.os, 'replace', fail)
+    with pytest.raises(OSError):
+        write_snapshot(str(tmp_path / 'other.snapshot'), data, sources)
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('other.snapshot')]
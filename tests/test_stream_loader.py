@@ -0,0 +1,68 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+import synthetic_data
+from stream_loader import iter_month_rows, iter_ndjson_rows, load_transactions
+from transaction_store import TransactionStore, TransactionStoreBuilder
+
+MONTHS = {
+    "january": [{"date": "2025-01-05", "type": "debit", "amount": 12345.678, "category": "Food",
+                 "description": "Braces {} and [brackets], \"quotes\" ₹"}],
+    "february": [],
+    "march": [{"date": "2025-03-01", "type": "credit", "amount": 1e3, "category": "Income"},
+              {"date": "2025-03-02", "type": "debit", "amount": 7, "category": "Food"}],
+}
+
+
+def expected_rows(months):
+    return [(month, t) for month, rows in months.items() for t in rows]
+
+
+@pytest.mark.parametrize("indent", [None, 4])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64])
+def test_tiny_chunks_give_the_same_rows_as_json_load(tmp_path, chunk_size, indent):
+    path = tmp_path / 'transactions.json'
+    path.write_text(json.dumps(MONTHS, indent=indent), encoding='utf-8')
+    assert list(iter_month_rows(str(path), chunk_size=chunk_size)) == expected_rows(MONTHS)
+
+
+@pytest.mark.parametrize("text", ['{}', ' { } ', '{"january": []}'])
+def test_empty_exports(tmp_path, text):
+    path = tmp_path / 'transactions.json'
+    path.write_text(text, encoding='utf-8')
+    assert list(iter_month_rows(str(path), chunk_size=2)) == []
+
+
+@pytest.mark.parametrize("text", ['', '[]', '{"january": [{"amount": 1}', '{"january": [] "february": []}'])
+def test_malformed_exports_raise(tmp_path, text):
+    path = tmp_path / 'transactions.json'
+    path.write_text(text, encoding='utf-8')
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_month_rows(str(path), chunk_size=3))
+
+
+def test_load_transactions_matches_from_months_for_json_and_ndjson(tmp_path):
+    months = synthetic_data.generate_transactions(500, rng=random.Random(0))
+    json_path = tmp_path / 'transactions.json'
+    json_path.write_text(json.dumps(months), encoding='utf-8')
+    ndjson_path = tmp_path / 'transactions.ndjson'
+    ndjson_path.write_text("".join(json.dumps(t) + "\n" for rows in months.values() for t in rows), encoding='utf-8')
+    assert [t for _, t in iter_ndjson_rows(str(ndjson_path))] == [t for _, t in expected_rows(months)]
+
+    expected = TransactionStore.from_months(months)
+    for store in (load_transactions(str(json_path), chunk_size=7), load_transactions(str(ndjson_path))):
+        for column, expected_column in zip(store.columns(), expected.columns()):
+            np.testing.assert_array_equal(column, expected_column)
+        assert store.categories == expected.categories
+
+
+def test_builder_chunks_concatenate_to_the_same_columns():
+    rows = [t for rows in synthetic_data.generate_transactions(100, rng=random.Random(1)).values() for t in rows]
+    chunked = TransactionStoreBuilder(chunk_rows=3)
+    for t in rows:
+        chunked.add(t)
+    for column, expected_column in zip(chunked.build().columns(), TransactionStore.from_rows(rows).columns()):
+        np.testing.assert_array_equal(column, expected_column)
@@ -0,0 +1,71 @@
+import random
+
+import numpy as np
+
+from transaction_store import TransactionStore
+
+CATEGORIES = ['Food', 'Housing', 'Transport', 'Gifts']
+
+
+def random_transaction(rng, day_range=400):
+    return {
+        'date': str(np.datetime64('2024-01-01') + rng.randrange(day_range)),
+        'amount': round(rng.uniform(1, 500), 2),
+        'type': rng.choice(['debit', 'credit']),
+        'category': rng.choice(CATEGORIES + ['New %d' % rng.randrange(3)]),
+    }
+
+
+def assert_same(store, rows):
+    """store holds exactly rows, as if it had been built from them in one go."""
+    expected = TransactionStore.from_rows(rows)
+    assert len(store) == len(rows)
+    np.testing.assert_array_equal(store.dates, expected.dates)
+    # Same-day rows may be in a different order, so compare them as sorted rows
+    names = lambda s: [s.categories[code] for code in s.category_codes]
+    assert sorted(zip(store.dates.tolist(), store.amounts.tolist(), store.types.tolist(), names(store))) == \
+        sorted(zip(expected.dates.tolist(), expected.amounts.tolist(), expected.types.tolist(), names(expected)))
+    assert store.rollups.months() == expected.rollups.months()
+    assert store.rollups.monthly.keys() == expected.rollups.monthly.keys()
+    for month, pair in expected.rollups.monthly.items():
+        np.testing.assert_allclose(store.rollups.monthly[month], pair)
+
+
+def test_stores_appended_from_one_parent_stay_independent():
+    rng = random.Random(0)
+    rows = sorted((random_transaction(rng) for _ in range(20)), key=lambda t: t['date'])
+    parent = TransactionStore.from_rows(rows)
+    # Every store keeps its own rows, whichever of its siblings wrote into the shared buffers first
+    stores = [(parent, list(rows))]
+    for _ in range(300):
+        store, store_rows = rng.choice(stores)
+        t = random_transaction(rng, day_range=800)
+        stores.append((store.appended(t), store_rows + [t]))
+    for store, store_rows in stores:
+        assert_same(store, store_rows)
+
+
+def test_back_dated_row_is_inserted_in_date_order():
+    rows = [{'date': '2025-01-05', 'amount': 10, 'type': 'debit', 'category': 'Food'},
+            {'date': '2025-03-05', 'amount': 20, 'type': 'debit', 'category': 'Food'}]
+    store = TransactionStore.from_rows(rows)
+    back_dated = store.appended({'date': '2025-02-01', 'amount': 5, 'type': 'credit', 'category': 'Gifts'})
+    assert back_dated.dates.tolist() == [np.datetime64('2025-01-05'), np.datetime64('2025-02-01'),
+                                         np.datetime64('2025-03-05')]
+    assert back_dated.rollups.month_total('2025-02', 'credit') == 5
+    assert len(store) == 2 and 'Gifts' not in store.categories
+
+
+def test_totals_by_category_over_a_date_range():
+    rng = random.Random(1)
+    rows = [random_transaction(rng) for _ in range(500)]
+    store = TransactionStore.from_rows(rows)
+    start, end = '2024-03-10', '2024-09-01'
+    expected = {}
+    for t in rows:
+        if t['type'] == 'debit' and start <= t['date'] < end:
+            expected[t['category']] = expected.get(t['category'], 0) + t['amount']
+    totals = store.totals_by_category('debit', start, end)
+    assert totals.keys() == expected.keys()
+    for category, amount in expected.items():
+        assert abs(totals[category] - amount) < 0.01
@@ -0,0 +1,194 @@
+import threading
+
+import numpy as np
+
+from rollups import Rollups
+
+# Transaction types are stored as small integer codes instead of strings.
+DEBIT = 0
+CREDIT = 1
+TYPE_CODES = {'debit': DEBIT, 'credit': CREDIT}
+
+
+def to_day(value):
+    """Converts a 'YYYY-MM-DD' string, date or datetime64 into a datetime64[D]."""
+    if value is None:
+        return None
+    return np.datetime64(value, 'D')
+
+
+class TransactionStore:
+    """Columnar view of every transaction, built once when the data is loaded.
+
+    Rows are kept sorted by date so any date range is a contiguous slice found
+    with a binary search. Amounts, types and category codes are NumPy arrays,
+    so group-bys over a range are vectorized; per-month totals are kept in
+    Rollups alongside them.
+
+    A store is never modified once built. appended() returns a new store with
+    one more row: the columns over-allocate like a list, and the newest store
+    on a set of buffers writes into their spare capacity, so an append is
+    amortized O(1) and earlier stores keep seeing only their own rows.
+    """
+
+    def __init__(self, dates, amounts, types, category_codes, categories, rollups=None):
+        # Exports are usually in date order already; only reorder (and copy) when they aren't.
+        if len(dates) > 1 and not (dates[1:] >= dates[:-1]).all():
+            order = np.argsort(dates, kind='stable')
+            dates, amounts, types, category_codes = dates[order], amounts[order], types[order], category_codes[order]
+        self.categories = list(categories)
+        self._category_index = {name: code for code, name in enumerate(self.categories)}
+        self._buffers = _Buffers((dates, amounts, types, category_codes), len(dates))
+        self._columns = (dates, amounts, types, category_codes)
+        # Snapshots pass in the rollups they saved instead of recomputing them from every row
+        if rollups is None:
+            rollups = Rollups.from_columns(dates, amounts, types, category_codes, self.categories)
+        self.rollups = rollups
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Builds the store from any iterable of transaction dicts."""
+        builder = TransactionStoreBuilder()
+        for t in rows:
+            builder.add(t)
+        return builder.build()
+
+    @classmethod
+    def from_months(cls, months):
+        """Builds the store from the month-keyed dict in 'Transactions Data.json'."""
+        return cls.from_rows(t for rows in months.values() for t in rows)
+
+    def columns(self):
+        """Returns (dates, amounts, types, category_codes) as one consistent set of views."""
+        return self._columns
+
+    dates = property(lambda self: self._columns[0])
+    amounts = property(lambda self: self._columns[1])
+    types = property(lambda self: self._columns[2])
+    category_codes = property(lambda self: self._columns[3])
+
+    def __len__(self):
+        return len(self._columns[0])
+
+    @property
+    def nbytes(self):
+        """Memory held by the column arrays."""
+        return sum(buffer.nbytes for buffer in self._buffers.columns)
+
+    def appended(self, t):
+        """Returns a new store with one more transaction dict, keeping rows in date order."""
+        date = to_day(t['date'])
+        amount = float(t['amount'])
+        kind = TYPE_CODES[t['type']]
+        category = t.get('category', 'Other')
+        categories = self.categories
+        code = self._category_index.get(category)
+        if code is None:
+            code = len(categories)
+            categories = categories + [category]
+        row = (date, amount, kind, code)
+        n = len(self)
+        buffers = self._buffers
+        with buffers.lock:
+            if n and date < self._columns[0][n - 1]:
+                # Back-dated rows go into a fresh copy
+                at = int(np.searchsorted(self._columns[0], date, side='right'))
+                buffers = _Buffers(tuple(np.insert(column, at, value) for column, value in zip(self._columns, row)), n + 1)
+            else:
+                if buffers.used != n or n == len(buffers.columns[0]):
+                    # Full, or a newer store already wrote past our rows: continue in a larger copy
+                    buffers = _Buffers(tuple(np.resize(column, max(16, 2 * n)) for column in self._columns), n)
+                for buffer, value in zip(buffers.columns, row):
+                    buffer[n] = value
+                buffers.used = n + 1
+
+        store = TransactionStore.__new__(TransactionStore)
+        store.categories = categories
+        store._category_index = dict(self._category_index, **{category: code})
+        store._buffers = buffers
+        store._columns = tuple(buffer[:n + 1] for buffer in buffers.columns)
+        store.rollups = self.rollups.copy()
+        store.rollups.add(str(np.datetime64(date, 'M')), category, t['type'], amount)
+        return store
+
+    def _range(self, dates, start=None, end=None):
+        """Returns the slice of rows with start <= date < end."""
+        lo = 0 if start is None else int(np.searchsorted(dates, to_day(start), side='left'))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, to_day(end), side='left'))
+        return slice(lo, hi)
+
+    def totals_by_category(self, kind='debit', start=None, end=None):
+        """Groups a date range by category and returns {category: total}."""
+        dates, amounts, types, codes = self.columns()
+        rows = self._range(dates, start, end)
+        mask = types[rows] == TYPE_CODES[kind]
+        categories = list(self.categories)
+        sums = np.bincount(codes[rows][mask], weights=amounts[rows][mask], minlength=len(categories))
+        return {name: round(float(sums[i]), 2) for i, name in enumerate(categories) if sums[i]}
+
+
+class _Buffers:
+    """Over-allocated column arrays shared by the stores appended from one another.
+
+    used is how many rows have been written; only the store holding exactly
+    that many rows may write the next one in place.
+    """
+
+    def __init__(self, columns, used):
+        self.columns = columns
+        self.used = used
+        self.lock = threading.Lock()
+
+
+class TransactionStoreBuilder:
+    """Accumulates transactions one row at a time into compact column chunks.
+
+    Only the current chunk is held as Python objects; every chunk_rows rows it
+    is converted to NumPy arrays, so memory stays proportional to the compact
+    columns rather than to the parsed JSON.
+    """
+
+    def __init__(self, chunk_rows=65536):
+        self.chunk_rows = chunk_rows
+        self.categories = {}  # name -> code
+        self._chunks = []
+        self._reset_pending()
+
+    def _reset_pending(self):
+        self._dates, self._amounts, self._types, self._codes = [], [], [], []
+
+    def add(self, t):
+        self._dates.append(t['date'])
+        self._amounts.append(float(t['amount']))
+        self._types.append(TYPE_CODES[t['type']])
+        self._codes.append(self.categories.setdefault(t.get('category', 'Other'), len(self.categories)))
+        if len(self._dates) >= self.chunk_rows:
+            self._flush()
+
+    def _flush(self):
+        if not self._dates:
+            return
+        self._chunks.append((
+            np.array(self._dates, dtype='datetime64[D]'),
+            np.array(self._amounts, dtype=np.float64),
+            np.array(self._types, dtype=np.int8),
+            np.array(self._codes, dtype=np.int32),
+        ))
+        self._reset_pending()
+
+    def build(self):
+        self._flush()
+        if not self._chunks:
+            columns = (np.array([], dtype='datetime64[D]'), np.array([], dtype=np.float64),
+                       np.array([], dtype=np.int8), np.array([], dtype=np.int32))
+        elif len(self._chunks) == 1:
+            columns = self._chunks[0]
+        else:
+            columns = tuple(np.concatenate(parts) for parts in zip(*self._chunks))
+        self._chunks = []
+        return TransactionStore(*columns, self.categories)
+
+
+def month_name(month):
+    """Formats a datetime64[M] as its English month name, e.g. 'August'."""
+    return np.datetime64(month, 'M').astype(object).strftime('%B')
@@ -0,0 +1,98 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+# User ids double as directory names, so only allow safe characters.
+USER_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def is_valid_user_id(user_id):
+    return isinstance(user_id, str) and USER_ID_PATTERN.match(user_id) is not None
+
+
+class UserDataStore:
+    """Loads each user's datasets on first access and keeps the hot ones in an LRU.
+
+    Every user has a directory under root holding the same JSON files as the
+    single-user setup. Loaded snapshots are kept until their estimated size
+    pushes the total over memory_budget bytes; the least recently used users
+    are then evicted and simply reloaded the next time they ask something.
+    """
+
+    def __init__(self, root, load, size_of, memory_budget=512 * 1024 * 1024):
+        self.root = root
+        self.load = load  # base_dir -> snapshot dict, or None if loading failed
+        self.size_of = size_of  # snapshot -> estimated bytes
+        self.memory_budget = memory_budget
+        self._users = OrderedDict()  # user_id -> (snapshot, size)
+        self._total = 0
+        self._lock = threading.Lock()
+        self._loading = {}  # user_id -> lock held while that user's files are parsed
+        self.loads = 0
+        self.evictions = 0
+
+    def user_dir(self, user_id):
+        return os.path.join(self.root, user_id)
+
+    def get(self, user_id):
+        """Returns the user's snapshot, loading it if needed, or None if they have no data."""
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None:
+                self._users.move_to_end(user_id)
+                return entry[0]
+            load_lock = self._loading.setdefault(user_id, threading.Lock())
+
+        # Only one thread parses a given user; the others wait for its result.
+        with load_lock:
+            with self._lock:
+                entry = self._users.get(user_id)
+                if entry is not None:
+                    self._users.move_to_end(user_id)
+                    return entry[0]
+
+            directory = self.user_dir(user_id)
+            data = self.load(directory) if os.path.isdir(directory) else None
+
+            with self._lock:
+                self._loading.pop(user_id, None)
+                if data is None:
+                    return None
+                self._put(user_id, data)
+                self.loads += 1
+        return data
+
+    def put(self, user_id, data):
+        """Publishes a new snapshot for a user, replacing the one they had."""
+        with self._lock:
+            self._put(user_id, data)
+
+    def _put(self, user_id, data):
+        size = self.size_of(data)
+        old = self._users.pop(user_id, None)
+        if old is not None:
+            self._total -= old[1]
+        self._users[user_id] = (data, size)
+        self._total += size
+        # Never evict the user that was just loaded, even if they alone exceed the budget.
+        while self._total > self.memory_budget and len(self._users) > 1:
+            _, (_, evicted_size) = self._users.popitem(last=False)
+            self._total -= evicted_size
+            self.evictions += 1
+
+    def evict(self, user_id):
+        with self._lock:
+            entry = self._users.pop(user_id, None)
+            if entry is not None:
+                self._total -= entry[1]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "users_loaded": len(self._users),
+                "memory_bytes": self._total,
+                "memory_budget_bytes": self.memory_budget,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }